@@ -0,0 +1,137 @@
+from collections import namedtuple
+
+import numpy as np
+
+from compact_board import blocked_moves
+from dynamics import DIRECTIONS
+
+# Snapshot of a Beasts for MazeWorldEnv.get_state; step() replaces the arrays
+# rather than writing into them, so they are shared, not copied
+BeastState = namedtuple("BeastState", ["beasts", "cells", "headings", "rng_state"])
+
+_ONE = np.uint8(1)
+_TWO = np.uint8(2)
+_THREE = np.uint8(3)
+_SEVENTEEN = np.uint8(17)
+
+
+class Beasts:
+    """Wild beasts: moving obstacles roaming one board, all advanced in one vectorized step.
+
+    Beasts live in flat cell indices (x * n + y) and headings (MazeWorldEnv
+    action indices) arrays. Each step every beast moves one cell along its
+    heading under the same walls and wraparound as the player, without
+    jumps. A beast that is blocked, or would walk onto the cell in `avoid`,
+    stays and picks a random new heading; the others turn at random with
+    probability `turn_prob`.
+
+    `occupancy` is an (n, n) uint8 grid with 1 where at least one beast
+    stands (several may share a cell). It is updated from the cells that
+    changed, so `occupied` is one lookup however many beasts there are.
+
+    Known limitation: beasts are not a small constant factor on top of a
+    step. On a 512x512 board 10k beasts add ~100-150us to every env step,
+    which costs ~12us without them, so the step is ~10x slower. Most of it
+    is the gathers from the per-cell tables and the two occupancy scatters,
+    ~2-4ns per beast each, which NumPy cannot fuse into one pass; closing
+    the gap needs a compiled kernel. Keep to a few hundred beasts where
+    step time matters.
+    """
+
+    def __init__(self, walls_h, walls_v, count, rng, turn_prob=0.1, exclude=()):
+        n = walls_h.shape[0]
+        self.n = n
+        self.rng = rng
+        # Turns are drawn from 6 bits of a random byte, see step()
+        self._turn_threshold = np.uint8(round(turn_prob * 64))
+        # One byte per cell: bit h is set when heading h is blocked by a wall, bit
+        # 4 + h when heading h wraps around the board. A table of target cells
+        # per (cell, heading) would be 32x larger and miss the cache on every
+        # lookup, which cost more than all the arithmetic in step()
+        x, y = np.divmod(np.arange(n * n), n)
+        next_x = x[:, None] + DIRECTIONS[:, 0]
+        next_y = y[:, None] + DIRECTIONS[:, 1]
+        wraps = (next_x % n != next_x) | (next_y % n != next_y)
+        blocked = blocked_moves(walls_h, walls_v).reshape(n * n, 4)
+        bits = np.arange(4)
+        self._moves = ((blocked << bits) | (wraps << bits + 4)).sum(axis=1).astype(np.uint8)
+        # Offset of the next cell by the key step() builds from that byte: bit 0
+        # blocked, bits 1-2 the heading and bit 4 wrapped. Blocked keys stay at 0
+        offsets = DIRECTIONS[:, 0] * n + DIRECTIONS[:, 1]
+        wrapped = offsets - DIRECTIONS[:, 0] * n * n - DIRECTIONS[:, 1] * n
+        self._offsets = np.zeros(32, dtype=offsets.dtype)
+        self._offsets[bits << 1] = offsets
+        self._offsets[bits << 1 | 16] = wrapped
+
+        # Spawn on random cells other than `exclude`, e.g. the player's start and the treasure
+        free = np.ones(n * n, dtype=bool)
+        free[[x * n + y for x, y in exclude]] = False
+        free = np.flatnonzero(free)
+        self.cells = free[rng.integers(len(free), size=count)]
+        self.headings = rng.integers(4, size=count, dtype=np.uint8)
+
+        self._occupancy = np.zeros(n * n, dtype=np.uint8)
+        self._occupancy[self.cells] = 1
+        self.occupancy = self._occupancy.reshape(n, n)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def positions(self):
+        """(count, 2) array of beast (x, y) positions."""
+        return np.stack(np.divmod(self.cells, self.n), axis=1)
+
+    def step(self, avoid=None):
+        """Move every beast once; beasts never step onto `avoid` (an (x, y) cell) if given."""
+        # Bits 0-1 of one random byte per beast are its next heading, bits 2-7 decide a turn.
+        # Raw 64-bit draws viewed as bytes cost about half of Generator.bytes.
+        # Every line below is one NumPy pass over the beasts, so there are as few
+        # as possible and all arithmetic: np.where on a random mask mispredicts
+        # branches and costs several times more at this size
+        count = len(self.cells)
+        draws = self.rng.bit_generator.random_raw((count + 7) // 8).view(np.uint8)[:count]
+        cells, headings = self.cells, self.headings
+        # Cells are always in range, and "clip" skips the bounds check of "raise"
+        key = self._moves.take(cells, mode="clip") >> headings
+        key &= _SEVENTEEN
+        key |= headings << _ONE
+        target = cells + self._offsets.take(key, mode="clip")
+        key &= _ONE
+        turn = key.view(bool)
+        turn |= draws >> _TWO < self._turn_threshold
+
+        # Beasts may share cells, so clear every old cell before marking the new ones
+        self._occupancy[cells] = 0
+        self._occupancy[target] = 1
+        if avoid is not None:
+            # Only the few beasts next to `avoid` can have walked onto it, and
+            # they stay where they were and turn
+            cell = avoid[0] * self.n + avoid[1]
+            if self._occupancy[cell]:
+                hit = target == cell
+                target[hit] = cells[hit]
+                turn |= hit
+                self._occupancy[cell] = 0
+                self._occupancy[target[hit]] = 1
+        self.cells = target
+        self.headings = headings ^ (headings ^ draws) & (turn.view(np.uint8) * _THREE)
+
+    def get_state(self):
+        return BeastState(self, self.cells, self.headings, self.rng.bit_generator.state)
+
+    def set_state(self, state):
+        self._occupancy[self.cells] = 0
+        self.cells = state.cells
+        self.headings = state.headings
+        self._occupancy[self.cells] = 1
+        self.rng.bit_generator.state = state.rng_state
+
+    def occupied(self, pos):
+        return bool(self.occupancy[pos[0], pos[1]])
+
+    def window(self, x0, y0, size):
+        """(size, size) occupancy of the window at (x0, y0), wrapping around."""
+        rows = np.arange(x0, x0 + size) % self.n
+        cols = np.arange(y0, y0 + size) % self.n
+        return self.occupancy[rows[:, None], cols]
@@ -0,0 +1,261 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from board import Board
+from compact_board import CompactBoard
+
+SIZES = [8, 16, 32, 64, 128, 256, 512, 1024]
+DENSITIES = [0.1, 0.3, 0.5, 0.7, 0.9]
+QUICK_SIZES = [8, 32, 128]
+QUICK_DENSITIES = [0.3, 0.7]
+PERCENTILES = [50, 90, 99]
+
+
+class Timer:
+    """Collects per-call samples until `min_time` has passed and `min_samples` were taken."""
+
+    def __init__(self, min_time=0.2, min_samples=3, max_samples=100000):
+        self.min_time = min_time
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+
+    def run(self, fn, setup=None, calls_per_sample=1):
+        samples = []
+        start = time.perf_counter()
+        while len(samples) < self.max_samples and (
+                len(samples) < self.min_samples or time.perf_counter() - start < self.min_time):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) / calls_per_sample)
+        return samples
+
+
+def _make_board(n, density, compact):
+    board_class = CompactBoard if compact else Board
+    return board_class(n, 3, density)
+
+
+def bench_env_step(timer, n, density, compact):
+    from environment import MazeWorldEnv
+
+    env = MazeWorldEnv(min_size=n, max_size=n, compact_board=compact)
+    env.reset(seed=0)
+    actions = iter(np.random.default_rng(0).integers(0, 4, size=timer.max_samples))
+    done = [False]
+
+    def step():
+        done[0] = env.step(next(actions))[2]
+
+    def reset_if_done():
+        if done[0]:
+            env.reset()
+
+    return timer.run(step, setup=reset_if_done)
+
+
+def bench_env_reset(timer, n, density, compact):
+    from environment import MazeWorldEnv
+
+    env = MazeWorldEnv(min_size=n, max_size=n, compact_board=compact)
+    env.reset(seed=0)
+    return timer.run(env.reset)
+
+
+def bench_wall_representation(timer, n, density, compact):
+    from environment import MazeWorldEnv
+
+    env = MazeWorldEnv(min_size=n, max_size=n)
+    env.reset(seed=0)
+    env.board = _make_board(n, density, compact)
+    return timer.run(env._get_wall_representation)
+
+
+def bench_board_init(timer, n, density, compact):
+    return timer.run(lambda: _make_board(n, density, compact))
+
+
+def bench_has_wall(timer, n, density, compact):
+    board = _make_board(n, density, compact)
+    rng = random.Random(0)
+    moves = []
+    for _ in range(1000):
+        x, y = rng.randrange(n), rng.randrange(n)
+        dx, dy = rng.choice([(1, 0), (0, 1), (-1, 0), (0, -1)])
+        moves.append(((x, y), ((x + dx) % n, (y + dy) % n)))
+
+    def lookups():
+        for from_pos, to_pos in moves:
+            board.has_wall(from_pos, to_pos)
+
+    return timer.run(lookups, calls_per_sample=len(moves))
+
+
+def bench_print_grid(timer, n, density, compact):
+    board = _make_board(n, density, compact)
+
+    def print_frame():
+        with contextlib.redirect_stdout(io.StringIO()):
+            board.print_grid((0, 0))
+
+    return timer.run(print_frame)
+
+
+def bench_draw_board(timer, n, density, compact):
+    import tkinter as tk
+    from mazegui import MazeGameGUI
+
+    try:
+        gui = MazeGameGUI(n, 3, density, _make_board(n, density, compact))
+    except tk.TclError:
+        # No display available
+        return None
+    try:
+        def draw_frame():
+            gui.draw_board()
+            gui.root.update_idletasks()
+
+        return timer.run(draw_frame)
+    finally:
+        gui.root.destroy()
+
+
+# name -> (function, whether the case depends on wall density)
+BENCHMARKS = {
+    "env_step": (bench_env_step, False),
+    "env_reset": (bench_env_reset, False),
+    "wall_representation": (bench_wall_representation, True),
+    "board_init": (bench_board_init, True),
+    "has_wall": (bench_has_wall, True),
+    "print_grid": (bench_print_grid, True),
+    "draw_board": (bench_draw_board, True),
+}
+
+
+def summarize(samples):
+    samples = np.asarray(samples)
+    summary = {
+        "samples": len(samples),
+        "mean": float(samples.mean()),
+        "min": float(samples.min()),
+        "max": float(samples.max()),
+        "per_second": float(1.0 / samples.mean()) if samples.mean() > 0 else None,
+    }
+    for q, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+        summary[f"p{q}"] = float(value)
+    return summary
+
+
+def run_benchmarks(names, sizes, densities, timer, compact=False, verbose=True):
+    results = []
+    for name in names:
+        fn, uses_density = BENCHMARKS[name]
+        for n in sizes:
+            for density in (densities if uses_density else [None]):
+                samples = fn(timer, n, 0.5 if density is None else density, compact)
+                result = {"name": name, "n": n, "density": density}
+                if samples is None:
+                    result["skipped"] = True
+                else:
+                    result.update(summarize(samples))
+                results.append(result)
+                if verbose:
+                    print(_format_result(result), flush=True)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "compact_board": compact,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1, metric="p50"):
+    """Return (rows, regressions) matching cases by (name, n, density)."""
+    base = {_key(result): result for result in baseline["results"] if not result.get("skipped")}
+    rows = []
+    regressions = []
+    for result in current["results"]:
+        old = base.get(_key(result))
+        if old is None or result.get("skipped"):
+            continue
+        ratio = result[metric] / old[metric] if old[metric] > 0 else float("inf")
+        row = (result["name"], result["n"], result["density"], old[metric], result[metric], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def _key(result):
+    return result["name"], result["n"], result["density"]
+
+
+def _format_result(result):
+    density = "-" if result["density"] is None else f"{result['density']:.1f}"
+    prefix = f"{result['name']:<20} n={result['n']:<5} d={density:<4}"
+    if result.get("skipped"):
+        return prefix + " skipped"
+    return (prefix + f" p50={result['p50'] * 1e6:12.2f}us p90={result['p90'] * 1e6:12.2f}us"
+            f" p99={result['p99'] * 1e6:12.2f}us ({result['samples']} samples)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark env stepping, board generation and rendering")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write JSON results")
+    compare_parser = subparsers.add_parser("compare", help="Run (or load) results and flag regressions against a baseline")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("-o", "--output", help="Write results to this JSON file")
+        sub.add_argument("-b", "--bench", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+        sub.add_argument("-n", "--sizes", nargs="+", type=int, help="Board sizes (default 8..1024)")
+        sub.add_argument("-d", "--densities", nargs="+", type=float, help="Wall densities (default 0.1..0.9)")
+        sub.add_argument("--quick", action="store_true", help="Small sweep for a fast check")
+        sub.add_argument("--compact", action="store_true", help="Benchmark CompactBoard instead of Board")
+        sub.add_argument("--min-time", type=float, default=0.2, help="Seconds to sample each case for")
+    compare_parser.add_argument("baseline", help="Baseline JSON results")
+    compare_parser.add_argument("--current", help="Compare these saved results instead of running")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare" and args.current:
+        with open(args.current) as f:
+            results = json.load(f)
+    else:
+        sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+        densities = args.densities or (QUICK_DENSITIES if args.quick else DENSITIES)
+        results = run_benchmarks(args.bench, sizes, densities, Timer(min_time=args.min_time), args.compact)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {args.output}")
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(baseline, results, args.threshold)
+        for name, n, density, old, new, ratio in rows:
+            flag = "REGRESSION" if ratio > 1 + args.threshold else ""
+            print(f"{name:<20} n={n:<5} d={density!s:<4} {old * 1e6:12.2f}us -> {new * 1e6:12.2f}us x{ratio:5.2f} {flag}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,10 @@ class TileColor(Enum):
     PLAYER = 5
 
 class Board:
-    def __init__(self, n, jump_tokens, density_walls):
+    def __init__(self, n, jump_tokens, density_walls, rng=None):
+        # random.Random the board is drawn from; by default one seeded from the
+        # global random state, so random.seed still reproduces boards
+        self.rng = rng if rng is not None else random.Random(random.getrandbits(64))
         self.n = n
         self.jump_tokens = jump_tokens
         self.density_walls = density_walls
@@ -28,50 +31,31 @@ class Board:
         self.print_grid((0,0))
 
     def print_grid(self, player_pos):
-        # Print top border with vertical walls
-        temp_store_colour = self.grid[player_pos[0]][player_pos[1]]
-        # set the player pos
-        self.grid[player_pos[0]][player_pos[1]] = TileColor.PLAYER
+        # Build the whole frame and print it at once
+        x, y = player_pos
+        letters = [[tile.name[0] for tile in row] for row in self.grid]
+        letters[x][y] = TileColor.PLAYER.name[0]
+        walls = self.walls
+        columns = range(self.n)
 
-        top_border = ""
-        for j in range(self.n):
-            if ('v', 0, j) in self.walls:  # Vertical wall above first row
-                top_border += "❚———"
-            else:
-                top_border += "————"
-        top_border += "—"
-        print(top_border)
-        
+        # Top border with the vertical walls of the first row
+        lines = ["".join("❚———" if ('v', 0, j) in walls else "————" for j in columns) + "—"]
         for i in range(self.n):
-            # Print row with values and vertical walls
-            row_str = ""
-            for j in range(self.n):
-                if ('v', i, j) in self.walls:  # Vertical wall to the left of cell (i,j)
-                    row_str += "❚ " + self.grid[i][j].name[0] + " "
-                else:
-                    row_str += "| " + self.grid[i][j].name[0] + " "
-            row_str += "|"
-            print(row_str)
-            
-            # Print horizontal divider with horizontal walls
-            divider = ""
-            for j in range(self.n):
-                if ('h', i, j) in self.walls:  # Horizontal wall below cell (i,j)
-                    divider += "—==="
-                else:
-                    divider += "————"
-            divider += "—"
-            print(divider)
-        self.grid[player_pos[0]][player_pos[1]] = temp_store_colour
-        
+            # Row with values and vertical walls (to the left of cell (i,j))
+            lines.append("".join(
+                ("❚ " if ('v', i, j) in walls else "| ") + letters[i][j] + " " for j in columns
+            ) + "|")
+            # Horizontal divider with horizontal walls (below cell (i,j))
+            lines.append("".join("—===" if ('h', i, j) in walls else "————" for j in columns) + "—")
+        print("\n".join(lines))
 
     def insert_jump(self):
         for _ in range(0, self.jump_tokens):
-            x = random.randint(0, self.n - 1)
-            y = random.randint(0, self.n - 1)
+            x = self.rng.randint(0, self.n - 1)
+            y = self.rng.randint(0, self.n - 1)
             while (self.grid[x][y] == TileColor.YELLOW and not (x == 0 and y == 0)):
-                x = random.randint(0, self.n - 1)
-                y = random.randint(0, self.n - 1)
+                x = self.rng.randint(0, self.n - 1)
+                y = self.rng.randint(0, self.n - 1)
             self.colour_in_square(x, y)
 
     def colour_in_square(self, x, y):
@@ -100,32 +84,33 @@ class Board:
         # Calculate number of walls based on density
         num_walls = int(self.n ** 2 * self.density_walls)
         
-        # Generate all possible wall positions
-        possible_walls = set()
+        # Generate all possible wall positions, in a fixed order so a seeded
+        # rng picks the same walls in every process (set order depends on hashing)
+        possible_walls = []
         
         # Horizontal walls (below each cell, except bottom row)
         for i in range(self.n - 1):
             for j in range(self.n):
-                possible_walls.add(('h', i, j))
+                possible_walls.append(('h', i, j))
         
         # Vertical walls (to the right of each cell, except rightmost column)
         for i in range(self.n):
             for j in range(self.n - 1):
-                possible_walls.add(('v', i, j))
+                possible_walls.append(('v', i, j))
         
         # Randomly select walls from possible positions
         if num_walls > len(possible_walls):
             num_walls = len(possible_walls)
         
-        selected_walls = random.sample(list(possible_walls), num_walls)
+        selected_walls = self.rng.sample(possible_walls, num_walls)
         self.walls = set(selected_walls)
 
     def insert_treasure(self):
-        x = random.randint(1, self.n - 1)
-        y = random.randint(1, self.n - 1)
+        x = self.rng.randint(1, self.n - 1)
+        y = self.rng.randint(1, self.n - 1)
         while self.grid[x][y] != TileColor.BLUE:
-            x = random.randint(0, self.n - 1)
-            y = random.randint(0, self.n - 1)
+            x = self.rng.randint(0, self.n - 1)
+            y = self.rng.randint(0, self.n - 1)
         
         self.grid[x][y] = TileColor.GREEN
         self.treasure_pos = (x, y)
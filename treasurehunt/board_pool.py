@@ -0,0 +1,179 @@
+import numpy as np
+
+from board import TileColor
+from compact_board import CompactBoard, blocked_moves, wall_tensor
+from dynamics import MAX_TOKENS, BoardModel
+from generator import BoardBatch, board_seeds, boards_per_chunk, episode_boards
+from shared_arrays import SharedArrays
+
+VERSION = 2
+# First array of every pool block: version, board count, board size and the
+# bytes per token_bit/cover mask, so a pool can be attached by its name alone
+_HEADER = {"header": ((4,), np.int64)}
+# Token masks of up to 8, 16, 32 and dynamics.MAX_TOKENS tokens
+_MASK_DTYPES = (np.uint8, np.uint16, np.uint32, np.int64)
+
+
+def mask_dtype(max_tokens):
+    """Narrowest dtype of token_bit/cover masks of boards with up to `max_tokens` tokens."""
+    for dtype in _MASK_DTYPES:
+        if max_tokens <= min(np.iinfo(dtype).bits, MAX_TOKENS):
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def pool_spec(count, n, mask=np.int64):
+    """SharedArrays spec of a pool of `count` n x n boards with `mask` token masks.
+
+    Besides the boards it holds their (n, n, 4) uint8 wall tensors, as
+    compact_board.wall_tensor builds them, and the blocked/token_bit/cover
+    arrays of their dynamics.BoardModel, so playing a pooled board derives
+    nothing from it. Boards with more than dynamics.MAX_TOKENS tokens have
+    int masks too wide for token_bit/cover; theirs are left zero and
+    `tokens` tells them apart.
+    """
+    return dict(_HEADER, **{
+        "tiles": ((count, n, n), np.uint8),
+        "walls_h": ((count, n, n), bool),
+        "walls_v": ((count, n, n), bool),
+        "walls": ((count, n, n, 4), np.uint8),
+        "treasure": ((count, 2), np.int64),
+        "jump_tokens": ((count,), np.int64),
+        "density_walls": ((count,), np.float64),
+        "tokens": ((count,), np.int64),
+        "blocked": ((count, n * n * 4), bool),
+        "token_bit": ((count, n * n), mask),
+        "cover": ((count, n * n), mask),
+    })
+
+
+class BoardPool:
+    """Boards built once by a parent process and shared zero-copy by its workers.
+
+    Every board lives in one multiprocessing.shared_memory block. A worker
+    attaches with BoardPool.attach(pool.name), or simply receives the pool
+    as a Process argument, which pickles as its name. `board(i)` and
+    `model(i)` are views into the block, wall tensor included, so dealing
+    a board copies nothing; the board copies its tiles only when a token
+    is taken, and memory stays flat however many workers play the pool.
+    `batch` copies boards out for VectorMazeWorldEnv. All arrays are
+    read-only. Token masks are the narrowest dtype that holds the most
+    tokens a board of the pool can have (uint8 for MazeWorldEnv's 0-3).
+
+    Workers must be started by the creating process's multiprocessing so
+    they share its resource tracker. close() unlinks the block in the
+    creating process, but raises BufferError while boards or models taken
+    from the pool are still referenced, e.g. by an env that played it;
+    drop those and close again.
+    """
+
+    def __init__(self, shared):
+        self._shared = shared
+        version, count, n, _ = shared["header"].tolist()
+        if version != VERSION:
+            raise ValueError(f"Unsupported board pool version {version}")
+        self.n = n
+        self._count = count
+        for array in shared.arrays.values():
+            array.flags.writeable = False
+
+    @classmethod
+    def create(cls, count, n, seed=0, chunk_size=None):
+        """Pool of `count` boards; board i is MazeWorldEnv(compact_board=True)'s board for board_seed(seed, i)."""
+        chunk_size = chunk_size or boards_per_chunk(n)
+        # episode_boards places up to 3 tokens
+        mask = mask_dtype(3)
+        shared = SharedArrays(pool_spec(count, n, mask))
+        shared["header"][:] = VERSION, count, n, mask.itemsize
+        for lo in range(0, count, chunk_size):
+            hi = min(lo + chunk_size, count)
+            seeds = board_seeds(seed, np.arange(lo, hi))
+            boards, jump_tokens, density_walls = episode_boards(n, seeds)
+            _fill(shared, lo, boards, jump_tokens, density_walls)
+        return cls(shared)
+
+    @classmethod
+    def from_level_store(cls, store, chunk_size=None):
+        """Copy every board of a level_store.LevelStore into a new pool."""
+        chunk_size = chunk_size or boards_per_chunk(store.n)
+        count = len(store)
+        # A board never has more tokens than were placed on it
+        mask = mask_dtype(store.jump_tokens)
+        shared = SharedArrays(pool_spec(count, store.n, mask))
+        shared["header"][:] = VERSION, count, store.n, mask.itemsize
+        for lo in range(0, count, chunk_size):
+            indices = np.arange(lo, min(lo + chunk_size, count))
+            _fill(shared, lo, store.batch(indices), store.jump_tokens, store.density_walls)
+        return cls(shared)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to the pool another process created, by its shared memory name."""
+        header = SharedArrays(_HEADER, name)
+        version, count, n, mask_bytes = header["header"].tolist()
+        header.close()
+        if version != VERSION:
+            raise ValueError(f"Unsupported board pool version {version}")
+        mask = next(np.dtype(dtype) for dtype in _MASK_DTYPES if np.dtype(dtype).itemsize == mask_bytes)
+        return cls(SharedArrays(pool_spec(count, n, mask), name))
+
+    @property
+    def name(self):
+        return self._shared.shm_name
+
+    def __reduce__(self):
+        return BoardPool.attach, (self.name,)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        return self._shared[key]
+
+    def board(self, index):
+        """Board `index` as a CompactBoard of views into the pool; it copies its tiles once it changes them."""
+        shared = self._shared
+        return CompactBoard.from_arrays(
+            shared["tiles"][index], shared["walls_h"][index], shared["walls_v"][index],
+            shared["treasure"][index], jump_tokens=int(shared["jump_tokens"][index]),
+            density_walls=float(shared["density_walls"][index]), walls_tensor=shared["walls"][index],
+        )
+
+    def model(self, index):
+        """dynamics.BoardModel of board `index` as dealt, made of views into the pool."""
+        shared = self._shared
+        if shared["tokens"][index] > MAX_TOKENS:
+            # Not in the pool, see pool_spec
+            return BoardModel(shared["tiles"][index], shared["walls_h"][index], shared["walls_v"][index])
+        return BoardModel.from_arrays(shared["tiles"][index], shared["blocked"][index],
+                                      shared["token_bit"][index], shared["cover"][index])
+
+    def batch(self, indices):
+        """BoardBatch holding copies of the boards at `indices`, as LevelStore.batch."""
+        shared = self._shared
+        indices = np.asarray(indices)
+        return BoardBatch(shared["tiles"][indices], shared["walls_h"][indices], shared["walls_v"][indices],
+                          shared["treasure"][indices])
+
+    def close(self):
+        """Unlink the pool (in the creating process) and unmap it, see the class docstring."""
+        self._shared.close()
+
+
+def _fill(shared, lo, boards, jump_tokens, density_walls):
+    hi = lo + len(boards.tiles)
+    tokens = (boards.tiles == TileColor.ORANGE.value).sum(axis=(1, 2))
+    shared["tiles"][lo:hi] = boards.tiles
+    shared["walls_h"][lo:hi] = boards.walls_h
+    shared["walls_v"][lo:hi] = boards.walls_v
+    shared["treasure"][lo:hi] = boards.treasure_pos
+    shared["jump_tokens"][lo:hi] = jump_tokens
+    shared["density_walls"][lo:hi] = density_walls
+    shared["tokens"][lo:hi] = tokens
+    shared["walls"][lo:hi] = wall_tensor(boards.walls_h, boards.walls_v, boards.tiles.shape[-1], dtype=np.uint8)
+    shared["blocked"][lo:hi] = blocked_moves(boards.walls_h, boards.walls_v).reshape(hi - lo, -1)
+    narrow = np.flatnonzero(tokens <= MAX_TOKENS)
+    if len(narrow):
+        model = BoardModel(boards.tiles[narrow], boards.walls_h[narrow], boards.walls_v[narrow])
+        shared["token_bit"][lo + narrow] = model.token_bit.reshape(len(narrow), -1)
+        shared["cover"][lo + narrow] = model.cover.reshape(len(narrow), -1)
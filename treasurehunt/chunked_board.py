@@ -0,0 +1,258 @@
+import io
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from board import Board, TileColor
+from generator import board_seeds, seeded_uniforms
+from terminal_renderer import TerminalRenderer
+
+_TILE_COLORS = tuple(TileColor)
+
+# Arrays of one generated chunk, indexed by the cell's offset inside it
+Chunk = namedtuple("Chunk", ["tiles", "walls_h", "walls_v"])
+
+# seeded_uniforms streams of a chunk seed; token t uses _TOKEN_STREAM + t
+_WALL_STREAM = 1
+_TOKEN_STREAM = 16
+# Stream of the board seed the treasure position is drawn from
+_TREASURE_STREAM = 2
+
+
+class ChunkedBoard(Board):
+    """Board of any size, generated in chunk_size x chunk_size chunks on first access.
+
+    Nothing is allocated up front: chunk (cx, cy) is drawn from
+    board_seeds(seed, cx * chunks_per_side + cy) when a cell in it is first
+    read and kept in an LRU cache of `max_chunks` chunks. An evicted chunk
+    is simply regenerated, except for its tiles once tokens were cleared
+    there, which are kept so the change survives; memory therefore grows
+    only with the chunks the agent has been to.
+
+    `grid`, `walls` and `has_wall` behave as on a plain Board, including
+    wraparound and walls on chunk edges. `walls` supports `in` but not
+    iteration or len(), which would need the whole world.
+
+    Each chunk holds `jump_tokens` tokens, placed at least one cell from its
+    edges so their 3x3 squares stay inside it, and every possible wall is
+    present with probability density_walls / 2 (Board picks n^2 * density
+    of its ~2n^2 possible walls). There is one treasure for the whole board,
+    and tokens whose square would cover it are left out.
+    """
+
+    def __init__(self, n, jump_tokens, density_walls, seed=None, chunk_size=64, max_chunks=256,
+                 treasure_pos=None):
+        self.rng = None
+        self.n = n
+        self.jump_tokens = jump_tokens
+        self.density_walls = density_walls
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy) % 2 ** 64
+        self.chunk_size = chunk_size
+        self.chunks_per_side = -(-n // chunk_size)
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        # Tiles of chunks where clear_square changed something
+        self._changed_tiles = {}
+        self.chunks_generated = 0
+
+        if treasure_pos is None:
+            # Any cell but the start
+            cell = 1 + int(seeded_uniforms([self.seed], _TREASURE_STREAM, 1)[0, 0] * (n * n - 1))
+            treasure_pos = divmod(cell, n)
+        self.treasure_pos = tuple(int(v) for v in treasure_pos)
+        self.grid = ChunkedGridView(self)
+        self.walls = ChunkedWallView(self)
+
+    def chunk(self, cx, cy):
+        """Chunk (cx, cy), generated or restored on a cache miss."""
+        key = (cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+        chunk = self._generate(cx, cy)
+        self._chunks[key] = chunk
+        if len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def _generate(self, cx, cy):
+        c = self.chunk_size
+        n = self.n
+        rows = min(c, n - cx * c)
+        cols = min(c, n - cy * c)
+        seed = board_seeds(self.seed, [cx * self.chunks_per_side + cy])
+        self.chunks_generated += 1
+
+        walls = seeded_uniforms(seed, _WALL_STREAM, 2 * rows * cols)[0].reshape(2, rows, cols)
+        walls = walls < self.density_walls / 2
+        walls_h, walls_v = walls
+        # As on Board there are no walls below the last row or right of the last column
+        if cx * c + rows == n:
+            walls_h[-1] = False
+        if cy * c + cols == n:
+            walls_v[:, -1] = False
+
+        tiles = self._changed_tiles.get((cx, cy))
+        if tiles is None:
+            tiles = np.full((rows, cols), TileColor.BLUE.value, dtype=np.uint8)
+            treasure_x, treasure_y = self.treasure_pos
+            has_treasure = treasure_x // c == cx and treasure_y // c == cy
+            if rows >= 3 and cols >= 3:
+                for token in range(self.jump_tokens):
+                    u = seeded_uniforms(seed, _TOKEN_STREAM + token, 2)[0]
+                    x = 1 + int(u[0] * (rows - 2))
+                    y = 1 + int(u[1] * (cols - 2))
+                    # Taking a token clears its square, so no square may cover the treasure
+                    if has_treasure and abs(x - treasure_x % c) <= 1 and abs(y - treasure_y % c) <= 1:
+                        continue
+                    # Like Board.insert_jump, tokens are not centred on yellow cells
+                    if tiles[x, y] != TileColor.YELLOW.value:
+                        tiles[x - 1:x + 2, y - 1:y + 2] = TileColor.YELLOW.value
+                        tiles[x, y] = TileColor.ORANGE.value
+            if has_treasure:
+                tiles[treasure_x % c, treasure_y % c] = TileColor.GREEN.value
+        return Chunk(tiles, walls_h, walls_v)
+
+    def tile(self, x, y):
+        c = self.chunk_size
+        return self.chunk(x // c, y // c).tiles[x % c, y % c]
+
+    def set_tile(self, x, y, value):
+        c = self.chunk_size
+        key = (x // c, y // c)
+        tiles = self.chunk(*key).tiles
+        tiles[x % c, y % c] = value
+        self._changed_tiles[key] = tiles
+
+    def has_wall(self, from_pos, to_pos):
+        # Same rules as Board.has_wall, on the chunk arrays
+        from_x, from_y = from_pos
+        to_x, to_y = to_pos
+        dx = (to_x - from_x + 1) % self.n - 1
+        dy = (to_y - from_y + 1) % self.n - 1
+        c = self.chunk_size
+        if dx == 1:
+            return bool(self.chunk(from_x // c, from_y // c).walls_h[from_x % c, from_y % c])
+        if dx == -1:
+            return bool(self.chunk(to_x // c, to_y // c).walls_h[to_x % c, to_y % c])
+        if dy == 1:
+            # ('v', x, n) is off the board, so moving right from the last column is never blocked
+            if from_y + 1 == self.n:
+                return False
+            return bool(self.chunk(from_x // c, (from_y + 1) // c).walls_v[from_x % c, (from_y + 1) % c])
+        if dy == -1:
+            return bool(self.chunk(from_x // c, from_y // c).walls_v[from_x % c, from_y % c])
+        return False
+
+    def window(self, x0, y0, rows, cols):
+        """(tiles, walls_h, walls_v) arrays of the rows x cols window at (x0, y0), wrapping around."""
+        tiles = np.empty((rows, cols), dtype=np.uint8)
+        walls_h = np.empty((rows, cols), dtype=bool)
+        walls_v = np.empty((rows, cols), dtype=bool)
+        # One slice copy per chunk; a small window touches at most four chunks
+        col_runs = self._runs(y0, cols)
+        for cx, row_source, row_target in self._runs(x0, rows):
+            for cy, col_source, col_target in col_runs:
+                chunk = self.chunk(cx, cy)
+                tiles[row_target, col_target] = chunk.tiles[row_source, col_source]
+                walls_h[row_target, col_target] = chunk.walls_h[row_source, col_source]
+                walls_v[row_target, col_target] = chunk.walls_v[row_source, col_source]
+        return tiles, walls_h, walls_v
+
+    def _runs(self, start, length):
+        """Split `length` wrapped cells from `start` into (chunk, slice in chunk, slice in window) runs."""
+        c = self.chunk_size
+        runs = []
+        done = 0
+        position = start % self.n
+        while done < length:
+            chunk, offset = divmod(position, c)
+            # A run ends at the chunk's edge, which for the last chunk is the board's
+            size = min(length - done, min(c, self.n - chunk * c) - offset)
+            runs.append((chunk, slice(offset, offset + size), slice(done, done + size)))
+            done += size
+            position = (position + size) % self.n
+        return runs
+
+    def wall_window(self, x0, y0, size):
+        """(size, size, 4) uint8 wall tensor of the window at (x0, y0), channels as in wall_tensor.
+
+        Matches the wrapped tensor MazeWorldEnv builds in egocentric mode:
+        the UP and LEFT channels read the wall of the cell above/left, which
+        wraps to the wall-free last row/column at the board's edge.
+        """
+        _, walls_h, walls_v = self.window(x0 - 1, y0 - 1, size + 1, size + 1)
+        walls = np.empty((size, size, 4), dtype=np.uint8)
+        walls[..., 0] = walls_v[1:, 1:]
+        walls[..., 1] = walls_h[:-1, 1:]
+        walls[..., 2] = walls_v[1:, :-1]
+        walls[..., 3] = walls_h[1:, 1:]
+        return walls
+
+    def show_stats(self):
+        # Walls are drawn per chunk on access, so there is no total to count
+        print(f"Size: {self.n}x{self.n} in {self.chunk_size}x{self.chunk_size} chunks")
+        print(f"Jump Tokens: {self.jump_tokens} per chunk")
+        print(f"Wall density: {self.density_walls}")
+        print("Board Grid:")
+        self.print_grid((0, 0))
+
+    def print_grid(self, player_pos, view_size=16):
+        """Print the view_size x view_size window centred on the player, in Board.print_grid's layout."""
+        out = io.StringIO()
+        renderer = TerminalRenderer(self, out=out, view_rows=view_size, view_cols=view_size)
+        x, y = player_pos
+        # A board smaller than the view is shown whole, as on a plain Board
+        renderer.origin = tuple((pos - size // 2) % self.n if size < self.n else 0
+                                for pos, size in ((x, renderer.rows), (y, renderer.cols)))
+        renderer.render(player_pos, f"Rows {renderer.origin[0]}+, columns {renderer.origin[1]}+ of {self.n}x{self.n}")
+        print(out.getvalue(), end="")
+
+
+class ChunkedGridView:
+    """board.grid for a ChunkedBoard: grid[x][y] reads and writes TileColor members."""
+
+    def __init__(self, board):
+        self.board = board
+
+    def __getitem__(self, x):
+        return ChunkedRowView(self.board, x)
+
+    def __len__(self):
+        return self.board.n
+
+
+class ChunkedRowView:
+    def __init__(self, board, x):
+        self.board = board
+        self.x = x
+
+    def __getitem__(self, y):
+        return _TILE_COLORS[self.board.tile(self.x, y)]
+
+    def __setitem__(self, y, tile):
+        self.board.set_tile(self.x, y, tile.value)
+
+    def __len__(self):
+        return self.board.n
+
+    def __iter__(self):
+        return (self[y] for y in range(self.board.n))
+
+
+class ChunkedWallView:
+    """board.walls for a ChunkedBoard; supports `('h' | 'v', x, y) in walls`."""
+
+    def __init__(self, board):
+        self.board = board
+
+    def __contains__(self, wall):
+        wall_type, x, y = wall
+        board = self.board
+        if not (0 <= x < board.n and 0 <= y < board.n):
+            return False
+        c = board.chunk_size
+        chunk = board.chunk(x // c, y // c)
+        planes = chunk.walls_h if wall_type == 'h' else chunk.walls_v
+        return bool(planes[x % c, y % c])
@@ -0,0 +1,79 @@
+"""Single entry point for the game and the training tools: `python cli.py <command> [args]`.
+
+Only argparse is imported up front; each command imports its own module
+when it runs, so `play` never loads NumPy, tkinter, gymnasium or torch.
+"""
+import argparse
+import importlib
+import sys
+
+# command: (module, function, help); the function takes the remaining arguments
+COMMANDS = {
+    "play": ("main", "play_main", "Play in the terminal"),
+    "gui": ("main", "gui_main", "Play in the Tk GUI"),
+    "train": ("cli", "train_main", "Train a PPO agent"),
+    "watch": ("cli", "watch_main", "Watch a saved agent play one board"),
+    "eval": ("policy_server", "main", "Evaluate a saved agent on many boards with batched inference"),
+    "plan": ("planner", "main", "Play with the optimal planner, optionally recording demonstrations"),
+    "bench": ("bench", "main", "Benchmark env stepping, board generation and rendering"),
+    "generate": ("level_store", "main", "Pregenerate boards into a level store"),
+    "replay": ("episodes", "main", "List, verify and replay recorded episodes"),
+    "telemetry": ("telemetry", "main", "Summarize or plot an episode telemetry log"),
+}
+
+
+def train_main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a PPO agent and save it as quick_test_model")
+    parser.add_argument("--timesteps", type=int, default=100000)
+    parser.add_argument("--num-envs", type=int, default=1, help="Boards stepped together (vectorized env if > 1)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the vectorized env")
+    parser.add_argument("--instrument", action="store_true", help="Print env phase timings while training")
+    parser.add_argument("--dump-interval", type=float, default=60, help="Seconds between instrumentation summaries")
+    parser.add_argument("--telemetry", help="Log every episode to this .csv or binary file (single process only)")
+
+    args = parser.parse_args(argv)
+    if args.telemetry and args.workers > 1:
+        parser.error("--telemetry needs --workers 1")
+    if args.num_envs == 1 and (args.workers > 1 or args.instrument):
+        # The single env trains in process and has no instrumentation hooks
+        parser.error("--workers and --instrument need --num-envs > 1")
+    import model
+    if args.num_envs > 1:
+        model.train_vectorized(args.num_envs, args.timesteps, args.workers, args.instrument, args.dump_interval,
+                               args.telemetry)
+    else:
+        model.main(args.timesteps, args.telemetry)
+
+
+def watch_main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a saved agent play one board")
+    parser.add_argument("model", nargs="?", default="quick_test_model", help="Path of a saved PPO model")
+    parser.add_argument("--no-board", action="store_true", help="Print the steps without drawing the board")
+    parser.add_argument("--record", help="Episode file to append the episode to")
+
+    args = parser.parse_args(argv)
+    import model
+    model.watch_agent_play(args.model, show_board=not args.no_board, record=args.record)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        usage="%(prog)s [-h] command [args ...]",
+        description="Treasure hunt game and RL tools",
+        epilog="\n".join(f"  {name:<10} {help_text}" for name, (_, _, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(COMMANDS), metavar="command",
+                        help="One of the commands below; see `<command> -h` for its arguments")
+
+    args = parser.parse_args(argv[:1])
+    module_name, function_name, _ = COMMANDS[args.command]
+    module = sys.modules[__name__] if module_name == "cli" else importlib.import_module(module_name)
+    # Usage lines of the command's own parser read "cli.py <command>"
+    sys.argv[0] = f"{parser.prog} {args.command}"
+    return getattr(module, function_name)(argv[1:])
+
+
+if __name__ == "__main__":
+    main()
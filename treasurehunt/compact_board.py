@@ -0,0 +1,271 @@
+from collections.abc import MutableSet
+import random
+
+import numpy as np
+
+from board import Board, TileColor
+
+# Index TileColor members by value without going through Enum lookup
+_TILE_COLORS = tuple(TileColor)
+_TILE_LETTERS = np.array([tile.name[0] for tile in TileColor])
+
+
+class CompactBoard(Board):
+    """Board stored as a uint8 tile array and two boolean wall planes.
+
+    `tiles[i, j]` holds the TileColor value of cell (i, j), `walls_h[i, j]` is
+    the ('h', i, j) wall and `walls_v[i, j]` the ('v', i, j) wall. `grid` and
+    `walls` are views over those arrays that behave like the list-of-lists and
+    set of tuples of a plain Board, so existing callers keep working.
+
+    `tiles` may start as a read-only view, e.g. into a BoardPool; the board
+    copies it the first time a tile changes. `walls_tensor`, if given to
+    from_arrays, is the board's (n, n, 4) uint8 wall tensor, which
+    MazeWorldEnv then observes instead of building its own.
+    """
+
+    walls_tensor = None
+
+    def __init__(self, n, jump_tokens, density_walls, rng=None):
+        self.rng = rng if rng is not None else random.Random(random.getrandbits(64))
+        self.n = n
+        self.jump_tokens = jump_tokens
+        self.density_walls = density_walls
+        self._init_arrays(
+            np.full((n, n), TileColor.BLUE.value, dtype=np.uint8),
+            np.zeros((n, n), dtype=bool),
+            np.zeros((n, n), dtype=bool),
+        )
+        self.insert_jump()
+        self.insert_walls()
+        self.insert_treasure()
+
+    @classmethod
+    def from_arrays(cls, tiles, walls_h, walls_v, treasure_pos, jump_tokens=0, density_walls=0.0,
+                    walls_tensor=None):
+        """Wrap existing arrays (not copied) as a board."""
+        board = cls.__new__(cls)
+        board.rng = None
+        board.n = tiles.shape[0]
+        board.jump_tokens = jump_tokens
+        board.density_walls = density_walls
+        board._init_arrays(tiles, walls_h, walls_v)
+        board.treasure_pos = tuple(int(v) for v in treasure_pos)
+        board.walls_tensor = walls_tensor
+        return board
+
+    def _init_arrays(self, tiles, walls_h, walls_v):
+        self.walls_h = walls_h
+        self.walls_v = walls_v
+        self.grid = GridView(tiles)
+        self.walls = WallSetView(walls_h, walls_v)
+
+    @property
+    def tiles(self):
+        # Owned by the grid, which swaps in the copy of read-only tiles
+        return self.grid.tiles
+
+    def print_grid(self, player_pos):
+        letters = _TILE_LETTERS[self.tiles]
+        letters[player_pos[0], player_pos[1]] = TileColor.PLAYER.name[0]
+
+        lines = ["".join("❚———" if wall else "————" for wall in self.walls_v[0]) + "—"]
+        for i in range(self.n):
+            lines.append("".join(
+                ("❚ " if wall else "| ") + letter + " "
+                for wall, letter in zip(self.walls_v[i], letters[i])
+            ) + "|")
+            lines.append("".join("—===" if wall else "————" for wall in self.walls_h[i]) + "—")
+        print("\n".join(lines))
+
+    def colour_in_square(self, x, y):
+        rows = [(x - 1) % self.n, x, (x + 1) % self.n]
+        cols = [(y - 1) % self.n, y, (y + 1) % self.n]
+        tiles = self.grid.writable_tiles()
+        tiles[np.ix_(rows, cols)] = TileColor.YELLOW.value
+        tiles[x, y] = TileColor.ORANGE.value
+
+    def clear_square(self, x, y):
+        rows = [(x - 1) % self.n, x, (x + 1) % self.n]
+        cols = [(y - 1) % self.n, y, (y + 1) % self.n]
+        self.grid.writable_tiles()[np.ix_(rows, cols)] = TileColor.BLUE.value
+
+    def insert_walls(self):
+        # Same wall positions as Board.insert_walls, numbered horizontal walls
+        # first, so a sample of indices can be written straight into the planes
+        num_horizontal = (self.n - 1) * self.n
+        num_possible = 2 * num_horizontal
+        num_walls = min(int(self.n ** 2 * self.density_walls), num_possible)
+
+        selected = np.array(self.rng.sample(range(num_possible), num_walls), dtype=np.int64)
+        horizontal = selected[selected < num_horizontal]
+        vertical = selected[selected >= num_horizontal] - num_horizontal
+        self.walls_h[:] = False
+        self.walls_v[:] = False
+        self.walls_h[horizontal // self.n, horizontal % self.n] = True
+        self.walls_v[vertical // (self.n - 1), vertical % (self.n - 1)] = True
+
+    def has_wall(self, from_pos, to_pos):
+        """Check if there's a wall blocking movement between two adjacent positions."""
+        from_x, from_y = from_pos
+        to_x, to_y = to_pos
+
+        # Same wrapping rules as Board.has_wall
+        dx = to_x - from_x
+        dy = to_y - from_y
+        if dx > 1:
+            dx = -1
+        elif dx < -1:
+            dx = 1
+        if dy > 1:
+            dy = -1
+        elif dy < -1:
+            dy = 1
+
+        if dx == 1:
+            return bool(self.walls_h[from_x, from_y])
+        elif dx == -1:
+            return bool(self.walls_h[to_x, to_y])
+        elif dy == 1:
+            # ('v', x, n) never exists, so moving right off the last column is free
+            return from_y + 1 < self.n and bool(self.walls_v[from_x, from_y + 1])
+        elif dy == -1:
+            return bool(self.walls_v[from_x, from_y])
+
+        return False
+
+
+class GridView:
+    """`grid[i][j]` access to a tile array, reading and writing TileColor members."""
+
+    def __init__(self, tiles):
+        self.tiles = tiles
+
+    def writable_tiles(self):
+        """The tile array, first copied if it is a read-only view."""
+        if not self.tiles.flags.writeable:
+            self.tiles = self.tiles.copy()
+        return self.tiles
+
+    def __getitem__(self, i):
+        return GridRowView(self, i)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __iter__(self):
+        for i in range(len(self.tiles)):
+            yield GridRowView(self, i)
+
+
+class GridRowView:
+    def __init__(self, grid, i):
+        self.grid = grid
+        self.i = i
+        self.row = grid.tiles[i]
+
+    def __getitem__(self, j):
+        return _TILE_COLORS[self.row[j]]
+
+    def __setitem__(self, j, tile):
+        # The row read so far may be of tiles the grid has not copied yet
+        self.row = self.grid.writable_tiles()[self.i]
+        self.row[j] = tile.value
+
+    def __len__(self):
+        return len(self.row)
+
+    def __iter__(self):
+        for value in self.row:
+            yield _TILE_COLORS[value]
+
+
+class WallSetView(MutableSet):
+    """Set of ('h'|'v', i, j) tuples backed by the two wall planes."""
+
+    def __init__(self, walls_h, walls_v):
+        self.planes = {'h': walls_h, 'v': walls_v}
+
+    def __contains__(self, wall):
+        try:
+            wall_type, row, col = wall
+            plane = self.planes[wall_type]
+        except (TypeError, ValueError, KeyError):
+            return False
+        n_rows, n_cols = plane.shape
+        return 0 <= row < n_rows and 0 <= col < n_cols and bool(plane[row, col])
+
+    def __iter__(self):
+        for wall_type, plane in self.planes.items():
+            for row, col in zip(*np.nonzero(plane)):
+                yield (wall_type, int(row), int(col))
+
+    def __len__(self):
+        return sum(int(np.count_nonzero(plane)) for plane in self.planes.values())
+
+    def add(self, wall):
+        wall_type, row, col = wall
+        self.planes[wall_type][row, col] = True
+
+    def discard(self, wall):
+        if wall in self:
+            wall_type, row, col = wall
+            self.planes[wall_type][row, col] = False
+
+
+def tile_array(board):
+    """(n, n) uint8 TileColor values of any board."""
+    if isinstance(board, CompactBoard):
+        return board.tiles
+    # _value_ is the plain attribute behind the Enum's value property, ~3x faster to read
+    return np.array([[tile._value_ for tile in row] for row in board.grid], dtype=np.uint8)
+
+
+def wall_planes(board):
+    """Boolean (n, n) horizontal and vertical wall planes of any board."""
+    if isinstance(board, CompactBoard):
+        return board.walls_h, board.walls_v
+    horizontal = np.zeros((board.n, board.n), dtype=bool)
+    vertical = np.zeros((board.n, board.n), dtype=bool)
+    if board.walls:
+        wall_types, rows, cols = (np.array(values) for values in zip(*board.walls))
+        is_horizontal = wall_types == 'h'
+        horizontal[rows[is_horizontal], cols[is_horizontal]] = True
+        vertical[rows[~is_horizontal], cols[~is_horizontal]] = True
+    return horizontal, vertical
+
+
+def wall_tensor(walls_h, walls_v, max_size, dtype=int):
+    """(max_size, max_size, 4) wall tensor padded past the board, channels by action.
+
+    A horizontal wall below (row, col) blocks DOWN (3) from (row, col) and UP
+    (1) from (row + 1, col); a vertical wall at (row, col) blocks RIGHT (0) from
+    (row, col) and LEFT (2) from (row, col + 1).
+    """
+    # Leading dimensions, if any, are a batch of boards
+    n = walls_h.shape[-1]
+    walls = np.zeros(walls_h.shape[:-2] + (max_size, max_size, 4), dtype=dtype)
+    walls[..., :n, :n, 3] = walls_h
+    walls[..., 1:n, :n, 1] = walls_h[..., :-1, :]
+    walls[..., :n, :n, 0] = walls_v
+    walls[..., :n, 1:n, 2] = walls_v[..., :, :-1]
+    return walls
+
+
+def blocked_moves(horizontal, vertical):
+    """(..., n, n, 4) mask of moves that Board.has_wall blocks, indexed by MazeWorldEnv action.
+
+    Mirrors has_wall including wraparound: moving down checks the wall below
+    the source cell, moving up checks the wall below the target cell, moving
+    right checks ('v', x, y + 1) (never set on the last column) and moving
+    left checks ('v', x, y).
+    """
+    blocked = np.zeros(horizontal.shape + (4,), dtype=bool)
+    blocked[..., 0] = horizontal
+    blocked[..., :-1, 1] = vertical[..., 1:]
+    # np.roll(horizontal, 1, axis=-2), without its overhead on small boards
+    blocked[..., 1:, :, 2] = horizontal[..., :-1, :]
+    blocked[..., 0, :, 2] = horizontal[..., -1, :]
+    blocked[..., 3] = vertical
+    return blocked
+
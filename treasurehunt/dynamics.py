@@ -0,0 +1,207 @@
+"""The rules of MazeWorldEnv.step as a pure function over arrays of states.
+
+`simulate(model, states, actions)` moves every state by its action on one
+board and returns the next states, rewards and terminated flags without
+touching any env or board object, so planners and model-based agents can
+try many hypothetical moves in one vectorized call. MazeWorldEnv.step is
+itself a call to `simulate` on a single state.
+"""
+import functools
+from collections import namedtuple
+
+import numpy as np
+
+from board import TileColor
+from compact_board import blocked_moves, tile_array, wall_planes
+
+# MazeWorldEnv rewards
+STEP_REWARD = -1
+TOKEN_REWARD = 5
+WIN_REWARD = 100
+TIMEOUT_REWARD = -10
+
+# (dx, dy) of each MazeWorldEnv action: right, up, left, down
+DIRECTIONS = np.array([[1, 0], [0, 1], [-1, 0], [0, -1]])
+
+# Tokens are bits of an int64 mask on boards with up to this many; a model
+# of a board with more uses Python int masks instead, see BoardModel
+MAX_TOKENS = 63
+
+# Fields are int64 arrays of the same shape, or ints for a single state: the
+# cell (x * n + y), jumps held, steps taken and the mask of tokens collected
+# (bit k is token k of the BoardModel; an object array of ints on wide models)
+State = namedtuple("State", ["cell", "jumps", "step_count", "collected"])
+
+_GREEN = TileColor.GREEN.value
+_ORANGE = TileColor.ORANGE.value
+# simulate() keeps a NumPy value on the left of every mixed expression:
+# int64 * bool_ is fast, while int * bool_ or bool_ & bool takes a slow path
+# costing microseconds, which would dominate single-state calls
+_ZERO = np.int64(0)
+_ONE = np.int64(1)
+_WIN = np.int64(WIN_REWARD)
+_TOKEN = np.int64(TOKEN_REWARD)
+_TIMEOUT = np.int64(TIMEOUT_REWARD)
+
+
+@functools.lru_cache(maxsize=8)
+def next_cells(n):
+    """Flat index of the cell each action leads to, wrapping around, at cell * 4 + action."""
+    x, y = np.divmod(np.arange(n * n), n)
+    next_x = (x[:, None] + DIRECTIONS[:, 0]) % n
+    next_y = (y[:, None] + DIRECTIONS[:, 1]) % n
+    cells = (next_x * n + next_y).ravel()
+    cells.flags.writeable = False
+    return cells
+
+
+class BoardModel:
+    """Arrays of a board's walls and starting tiles, as simulate() reads them.
+
+    Tiles are those before any token was taken. The tokens (orange cells)
+    are listed in `tokens` in row-major order, token k being bit k of a
+    `collected` mask, and `cover[cell]` has bit k set when taking token k
+    clears that cell, so the tile a state sees follows from its mask.
+    Build it before tokens are taken, e.g. on reset.
+
+    Given (B, n, n) arrays it models B same-size boards at once: cell
+    b * n * n + x * n + y is (x, y) on board b, `tokens[b]` lists board b's
+    tokens and `set_boards` replaces some of them, as a vector env does
+    when its boards finish. simulate() itself never writes to a model.
+
+    Once a board has more than MAX_TOKENS tokens the model is `wide`: its
+    token_bit and cover become object arrays of Python ints, and so must
+    the `collected` masks of its states (initial_state gives such states).
+    Such boards step several times slower, but play by the same rules.
+    """
+
+    def __init__(self, tiles, walls_h, walls_v):
+        n = tiles.shape[-1]
+        self.n = n
+        self.shape = tiles.shape[:-2]
+        count = int(np.prod(self.shape, dtype=int))
+        # Cell reached by each move (cell * 4 + action), wrapping around on its own board
+        self.next_cell = next_cells(n)
+        if self.shape:
+            self.next_cell = (self.next_cell + np.arange(count)[:, None] * (n * n)).ravel()
+        # Whether each move crosses a wall, as Board.has_wall decides
+        self.blocked = blocked_moves(walls_h, walls_v).ravel()
+        self.tiles = tiles.ravel().copy()
+        self.token_bit = np.zeros(count * n * n, dtype=np.int64)
+        self.cover = np.zeros(count * n * n, dtype=np.int64)
+        self.wide = False
+        self._tokens = [[] for _ in range(count)]
+        self._add_tokens(range(count), tiles.reshape(count, n, n))
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(tile_array(board), *wall_planes(board))
+
+    @classmethod
+    def from_arrays(cls, tiles, blocked, token_bit, cover):
+        """Model of one board from arrays a model already computed, e.g. a BoardPool's; nothing is copied."""
+        model = cls.__new__(cls)
+        n = tiles.shape[-1]
+        model.n = n
+        model.shape = ()
+        model.next_cell = next_cells(n)
+        model.blocked = blocked.reshape(-1)
+        model.tiles = tiles.reshape(-1)
+        model.token_bit = token_bit.reshape(-1)
+        model.cover = cover.reshape(-1)
+        model.wide = False
+        # Token k is the k-th token cell in row-major order, as in _add_tokens
+        model._tokens = [[divmod(cell, n) for cell in np.flatnonzero(model.token_bit).tolist()]]
+        return model
+
+    @property
+    def tokens(self):
+        return self._tokens if self.shape else self._tokens[0]
+
+    def set_boards(self, boards, tiles, walls_h, walls_v):
+        """Model the (len(boards), n, n) boards given in place of boards `boards` of the batch."""
+        n = self.n
+        cells = n * n
+        self.blocked.reshape(-1, cells * 4)[boards] = blocked_moves(walls_h, walls_v).reshape(len(boards), -1)
+        self.tiles.reshape(-1, cells)[boards] = tiles.reshape(len(boards), -1)
+        self.token_bit.reshape(-1, cells)[boards] = 0
+        self.cover.reshape(-1, cells)[boards] = 0
+        self._add_tokens(np.asarray(boards).tolist(), tiles)
+
+    def _add_tokens(self, boards, tiles):
+        n = self.n
+        cells = n * n
+        for b, board_tiles in zip(boards, tiles):
+            token_cells = np.flatnonzero(board_tiles.ravel() == _ORANGE)
+            if len(token_cells) > MAX_TOKENS and not self.wide:
+                self.token_bit = self.token_bit.astype(object)
+                self.cover = self.cover.astype(object)
+                self.wide = True
+            tokens = [divmod(cell, n) for cell in token_cells.tolist()]
+            self._tokens[b] = tokens
+            base = b * cells
+            for k, (x, y) in enumerate(tokens):
+                self.token_bit[base + x * n + y] = 1 << k
+                # Same 3x3 square, wrapping around, as Board.clear_square
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        self.cover[base + (x + dx) % n * n + (y + dy) % n] |= 1 << k
+
+    def initial_state(self):
+        """States at the start of an episode: (0, 0), no jumps, no steps, no tokens."""
+        if not self.shape:
+            return State(0, 0, 0, 0)
+        zeros = np.zeros(self.shape, dtype=np.int64)
+        start = np.arange(zeros.size).reshape(self.shape) * (self.n * self.n)
+        return State(start, zeros, zeros.copy(), zeros.astype(object) if self.wide else zeros.copy())
+
+
+def episode_return(length, tokens, won, max_steps=200):
+    """Sum of the rewards simulate() gives over an episode of `length` steps, from what happened in it."""
+    return (STEP_REWARD * length + TOKEN_REWARD * tokens + WIN_REWARD * won
+            + TIMEOUT_REWARD * (length >= max_steps))
+
+
+def simulate(model, states, actions, max_steps=200, occupied=None):
+    """One MazeWorldEnv step from each of `states` (a State of arrays) taking `actions`.
+
+    Moves wrap around; a move across a wall goes through only by spending
+    a jump; landing on the treasure wins and on a token takes it for a
+    jump, clearing its 3x3 square; the step that reaches `max_steps` ends
+    the episode with the timeout penalty. `occupied`, if given, is a flat
+    (n * n,) mask of cells that cannot be entered at all, e.g. beasts.
+
+    Returns (next states, rewards, terminated), all shaped like the inputs.
+    States that already ended are stepped like any other.
+    """
+    cell, jumps, step_count, collected = states
+    move = cell * 4 + actions
+    target = model.next_cell[move]
+    blocked = model.blocked[move]
+
+    jumped = blocked & (_ZERO < jumps)
+    # No wall, or a wall and a jump spent on it
+    moved = blocked == jumped
+    if occupied is not None:
+        moved &= occupied[target] == 0
+        jumped &= moved
+    # Selections are arithmetic, which is faster than np.where on mixed masks
+    # and works the same on scalars
+    cell = (target - cell) * moved + cell
+
+    # A tile inside a cleared square is plain blue, whatever it was before
+    intact = (model.cover[cell] & collected) == 0
+    tile = model.tiles[cell]
+    won = (tile == _GREEN) & intact
+    picked = (tile == _ORANGE) & intact
+    if model.wide and np.ndim(cell) == 0:
+        # A Python int mask wider than int64 cannot be multiplied by a NumPy bool
+        collected = collected | model.token_bit[cell] if picked else collected
+    else:
+        collected = model.token_bit[cell] * picked | collected
+    jumps = _ONE * picked - jumped + jumps
+
+    step_count = _ONE + step_count
+    timed_out = step_count >= max_steps
+    rewards = _WIN * won + _TOKEN * picked + _TIMEOUT * timed_out + STEP_REWARD
+    return State(cell, jumps, step_count, collected), rewards, won | timed_out
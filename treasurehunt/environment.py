@@ -2,169 +2,503 @@ import gymnasium as gym
 import numpy as np
 from board import Board, TileColor
 from player import Player
+from compact_board import tile_array, wall_planes, wall_tensor
+from compact_board import CompactBoard
+from chunked_board import ChunkedBoard
+from beasts import Beasts
+from board_pool import BoardPool
+from snapshot import EnvState, TileHistory
+from dynamics import DIRECTIONS, BoardModel, State, episode_return, simulate
+from generator import board_seed, episode_boards, episode_levels
+from level_store import LevelStore
+from solver import solve
 import random
 
+# "dense" is the original int tensor; "uint8" and "packed" shrink it, and
+# "egocentric" replaces it with a view_size x view_size window around the agent
+OBS_MODES = ("dense", "uint8", "packed", "egocentric")
+
 class MazeWorldEnv(gym.Env):
-    def __init__(self, min_size=8, max_size=15):
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 8}
+
+    def __init__(self, min_size=8, max_size=15, compact_board=False, reuse_obs_buffers=False, level_store=None,
+                 require_solvable=False, report_optimal=False, instrumentation=None,
+                 obs_mode="dense", view_size=9, flatten_obs=False, render_mode=None, cell_size=16,
+                 chunk_size=None, max_chunks=256, num_beasts=0, beast_turn_prob=0.1, board_pool=None, telemetry=None):
         self.min_size = min_size
         self.max_size = max_size
         self.current_size = min_size
+        # Generate array-backed CompactBoards instead of lists of TileColor
+        self.compact_board = compact_board
+
+        # With chunk_size, play ChunkedBoards that are generated around the agent
+        # as it explores, for boards far too large to build up front
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        if chunk_size is not None:
+            if obs_mode != "egocentric":
+                raise ValueError("Chunked boards need obs_mode='egocentric'; the full wall tensor would not fit")
+            if require_solvable or report_optimal:
+                raise ValueError("The solver needs the whole board and does not support chunked boards")
+            if num_beasts:
+                raise ValueError("Beasts need the whole board's walls and do not support chunked boards")
+
+        # Wild beasts: num_beasts moving obstacles that block the cells they stand on
+        self.num_beasts = num_beasts
+        self.beast_turn_prob = beast_turn_prob
+        self.beasts = None
+
+        # Optionally sample pregenerated boards from a level store (path or LevelStore)
+        if isinstance(level_store, str):
+            level_store = LevelStore(level_store)
+        self.level_store = level_store
+        if level_store is not None:
+            if level_store.n > max_size:
+                raise ValueError(f"Level store boards are {level_store.n}x{level_store.n}, larger than max_size={max_size}")
+            self.current_size = level_store.n
+
+        # Or from a BoardPool in shared memory (a pool or its name), which many
+        # worker processes play without each holding their own boards
+        if isinstance(board_pool, str):
+            board_pool = BoardPool.attach(board_pool)
+        self.board_pool = board_pool
+        if board_pool is not None:
+            if level_store is not None:
+                raise ValueError("Pass either a level store or a board pool, not both")
+            if board_pool.n > max_size:
+                raise ValueError(f"Pool boards are {board_pool.n}x{board_pool.n}, larger than max_size={max_size}")
+            self.current_size = board_pool.n
         
         self.max_steps = 200  # Prevent infinite episodes
         self.step_count = 0
 
+        # Use the solver to skip boards that cannot be won within max_steps and/or
+        # to report the optimal episode length in `info`
+        self.require_solvable = require_solvable
+        self.report_optimal = report_optimal
+        self.max_board_attempts = 100
+        self.optimal_path_length = None
+
+        # Episode i's board is drawn from its own generator seeded with
+        # board_seed(base_seed, i), so any board can be rebuilt from its index
+        # and envs never share a random stream. reset(seed=...) sets base_seed
+        self.base_seed = int(np.random.SeedSequence().entropy)
+        self.episode_index = -1
+        self.board_seed = None
+
 
         # create the components
         self.board = None
         self.player = None
+        # Records token squares cleared on the board, so get_state/set_state
+        # can branch a game without copying its tiles
+        self._tile_history = None
+        # dynamics.BoardModel of the board as it was dealt, and the mask of its
+        # tokens collected so far (unused on chunked boards)
+        self._model = None
+        self._collected = 0
+        # On chunked boards, models of the 3x3 windows the agent stepped from,
+        # by position; dropped whenever tiles change
+        self._window_models = {}
+        # (wall hit, moved, token taken) in the last step, read by instrumentation
+        self.last_step_events = None
 
         # Define the agent and target location; randomly chosen in `reset` and updated in `step`
         self._agent_location = np.array([-1, -1], dtype=np.int32)
         self._target_location = np.array([-1, -1], dtype=np.int32)
 
-        self.observation_space = gym.spaces.Dict({
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"obs_mode must be one of {OBS_MODES}, got {obs_mode!r}")
+        self.obs_mode = obs_mode
+        self.view_size = view_size
+
+        spaces = {
             "agent": gym.spaces.Box(0, max_size - 1, shape=(2,), dtype=int),
             "target": gym.spaces.Box(0, max_size - 1, shape=(2,), dtype=int),
             "board_size": gym.spaces.Box(min_size, max_size, shape=(1,), dtype=int),
             "jumps_remaining": gym.spaces.Box(0, 3, shape=(1,), dtype=int),
+        }
+        # Built per mode, as a full-size Box would allocate max_size^2 bounds even when unused
+        if obs_mode == "dense":
             # Optional: include board state
-            "walls": gym.spaces.Box(0, 1, shape=(max_size, max_size, 4), dtype=int)  # 4 directions
-        })
+            spaces["walls"] = gym.spaces.Box(0, 1, shape=(max_size, max_size, 4), dtype=int)  # 4 directions
+        elif obs_mode == "uint8":
+            spaces["walls"] = gym.spaces.Box(0, 1, shape=(max_size, max_size, 4), dtype=np.uint8)
+        elif obs_mode == "packed":
+            # np.packbits of the flattened (max_size, max_size, 4) tensor
+            spaces["walls"] = gym.spaces.Box(0, 255, shape=((max_size * max_size * 4 + 7) // 8,), dtype=np.uint8)
+        elif obs_mode == "egocentric":
+            spaces["walls"] = gym.spaces.Box(0, 1, shape=(view_size, view_size, 4), dtype=np.uint8)
+            # Shortest wrapped offset from the agent to the treasure
+            spaces["target_offset"] = gym.spaces.Box(-(max_size // 2), max_size // 2, shape=(2,), dtype=int)
+        if num_beasts:
+            # 1 where a beast stands, over the same cells as "walls"
+            shape = (view_size, view_size) if obs_mode == "egocentric" else (max_size, max_size)
+            spaces["beasts"] = gym.spaces.Box(0, 1, shape=shape, dtype=np.uint8)
+        self.observation_space = gym.spaces.Dict(spaces)
+
+        # Optionally concatenate everything into one float Box for MLP policies
+        self.flatten_obs = flatten_obs
+        self._dict_observation_space = self.observation_space
+        if flatten_obs:
+            flat = gym.spaces.flatten_space(self.observation_space)
+            self.observation_space = gym.spaces.Box(flat.low, flat.high, dtype=np.float32)
+
+        # Walls never change within an episode, so the tensor is built once per reset.
+        # In egocentric mode it is the board's tensor padded with view_size - 1
+        # wrapped cells, so the window around the agent is a plain slice
+        self._walls = None
+
+        # Optionally write every observation into the same preallocated arrays and
+        # hand out read-only views of them, so stepping allocates nothing
+        self.reuse_obs_buffers = reuse_obs_buffers
+        if reuse_obs_buffers:
+            self._obs_buffers = {
+                key: np.zeros(space.shape, dtype=space.dtype)
+                for key, space in self._dict_observation_space.spaces.items()
+            }
+            self._obs_views = {key: _read_only(buffer) for key, buffer in self._obs_buffers.items()}
 
         # We have 4 actions, corresponding to "right", "up", "left", "down"
         self.action_space = gym.spaces.Discrete(4)
         # Dictionary maps the abstract actions to the directions on the grid
-        self._action_to_direction = {
-            0: np.array([1, 0]),  # right
-            1: np.array([0, 1]),  # up
-            2: np.array([-1, 0]),  # left
-            3: np.array([0, -1]),  # down
-        }
+        self._action_to_direction = dict(enumerate(DIRECTIONS))
+
+        # render_mode="rgb_array" draws frames with NumPy, no display needed
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"render_mode must be one of {self.metadata['render_modes']}, got {render_mode!r}")
+        self.render_mode = render_mode
+        self._renderer = None
+        if render_mode == "rgb_array":
+            from rgb_renderer import RgbRenderer
+            self._renderer = RgbRenderer(cell_size)
+
+        # Optional instrumentation.Instrumentation; it wraps this env's methods,
+        # so nothing is timed or counted unless one is passed in
+        self.instrumentation = None
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+        # Optional telemetry.Telemetry that every finished episode is recorded to
+        self.telemetry = telemetry
     
     def reset(self, seed=None, options=None):
         # Handle seeding for reproducibility
+        super().reset(seed=seed)
         if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+            self.base_seed = seed
+            self.episode_index = -1
 
         self.step_count = 0
-        num_jumps = random.randint(0, 3)
-        density_walls = random.uniform(0.5, 0.8)
 
-        # Create new board each episode
-        self.board = Board(self.current_size, num_jumps, density_walls)
+        # Create new board each episode; options={"episode_index": i} rebuilds board i
+        if options and "episode_index" in options:
+            self.episode_index = int(options["episode_index"])
+        else:
+            self.episode_index += 1
+        self.board_seed = board_seed(self.base_seed, self.episode_index)
+        self.board, info = self._new_board(options, self.board_seed)
+        self.optimal_path_length = None
+        if self.require_solvable or self.report_optimal:
+            fixed_level = options is not None and ("level" in options or "board" in options)
+            episode_seed = self.board_seed
+            for attempt in range(1, self.max_board_attempts):
+                field = solve(self.board)
+                # Redraw boards that cannot be won before the step limit
+                winnable = 0 <= field.start_distance <= self.max_steps
+                if winnable or not self.require_solvable or fixed_level:
+                    break
+                # Redraws are seeded from the episode's seed, so they are reproducible too
+                self.board_seed = board_seed(episode_seed, attempt)
+                self.board, info = self._new_board(options, self.board_seed)
+            else:
+                field = solve(self.board)
+            self.optimal_path_length = field.start_distance
+            info["optimal_path_length"] = self.optimal_path_length
+        info["episode_index"] = self.episode_index
+        info["board_seed"] = self.board_seed
         self.player = Player()
         
         # Get positions from your board
         self._agent_location = np.array(self.player.get_pos())
+        if self.num_beasts:
+            # Seeded from the board, so episode i always has the same beasts
+            self.beasts = Beasts(*wall_planes(self.board), self.num_beasts, np.random.default_rng(self.board_seed),
+                                 self.beast_turn_prob, exclude=[self.player.get_pos(), self.board.get_treasure_pos()])
+        self._tile_history = TileHistory(self.board)
+        if self.chunk_size is not None:
+            self._model = None
+        elif self.board_pool is not None and "level" in info:
+            # The pool holds the model too, so reset only points into it
+            self._model = self.board_pool.model(info["level"])
+        else:
+            self._model = BoardModel.from_board(self.board)
+        self._collected = 0
+        self._window_models.clear()
+        self._load_board()
+        return self._get_obs(), info
+
+    def _load_board(self):
+        """Set up everything derived from self.board for a new episode or a restored state."""
         self._target_location = np.array(self.board.get_treasure_pos())  # You'll need this method
-        return self._get_obs(), {}
+        self._walls = None if self.chunk_size is not None else _read_only(self._get_wall_representation())
+        if self._renderer is not None and self.chunk_size is None:
+            self._renderer.set_board(tile_array(self.board), *wall_planes(self.board))
+        if self.reuse_obs_buffers:
+            self._obs_buffers["target"][:] = self._target_location
+            self._obs_buffers["board_size"][0] = self.current_size
+            if self.obs_mode != "egocentric":
+                self._obs_buffers["walls"][:] = self._walls
 
-    def _calculate_new_position(self, pos, direction):
-        dx = direction[0]
-        dy = direction[1]
+    def _new_board(self, options, seed):
+        info = {}
 
-        new_x = pos[0] + dx
-        new_y = pos[1] + dy
+        if options and "board" in options:
+            # options={"board": board} plays a given board, e.g. a recorded episode's
+            return options["board"], info
+        elif self.level_store is not None or self.board_pool is not None:
+            # options={"level": i} replays a specific stored board
+            levels = self.level_store if self.level_store is not None else self.board_pool
+            if options and "level" in options:
+                level = int(options["level"])
+            else:
+                level = int(episode_levels([seed], len(levels))[0])
+            info["level"] = level
+            if self.board_pool is not None:
+                return self.board_pool.board(level), info
+            return self.level_store.to_board(level), info
+        elif self.chunk_size is not None:
+            rng = random.Random(seed)
+            num_jumps = rng.randint(0, 3)
+            density_walls = rng.uniform(0.5, 0.8)
+            return ChunkedBoard(self.current_size, num_jumps, density_walls, seed=seed,
+                                chunk_size=self.chunk_size, max_chunks=self.max_chunks), info
+        elif self.compact_board:
+            # Same boards as VectorMazeWorldEnv draws for the same seeds
+            boards, num_jumps, density_walls = episode_boards(self.current_size, [seed])
+            return CompactBoard.from_arrays(
+                boards.tiles[0], boards.walls_h[0], boards.walls_v[0], boards.treasure_pos[0],
+                jump_tokens=int(num_jumps[0]), density_walls=float(density_walls[0]),
+            ), info
+        else:
+            rng = random.Random(seed)
+            num_jumps = rng.randint(0, 3)
+            density_walls = rng.uniform(0.5, 0.8)
+            return Board(self.current_size, num_jumps, density_walls, rng=rng), info
 
-        # Handle wrapping
-        if (new_x < 0):
-            new_x = self.current_size - 1
-        elif new_x == self.current_size:
-            new_x = 0
-        
-        if (new_y < 0):
-            new_y = self.current_size - 1
-        elif (new_y == self.current_size):
-            new_y = 0
+    def step(self, action):
+        action = int(action)
+        current_pos = tuple(self._agent_location.tolist())
 
-        new_pos = (new_x, new_y)
-        return new_pos
+        # Beasts move first and never onto the agent; the agent then cannot
+        # enter a cell a beast stands on, even with a jump
+        if self.beasts is not None:
+            self.beasts.step(avoid=current_pos)
 
-    def step(self, action):
+        # The rules themselves (walls, jumps, tokens, treasure, timeout) are dynamics.simulate
+        new_pos, jumps, picked, reward, done = self._transition(current_pos, action)
         self.step_count += 1
-    
-        direction = self._action_to_direction[int(action)]
-        current_pos = tuple(self._agent_location)
-        
-        # Calculate new position with wrapping
-        new_pos = self._calculate_new_position(current_pos, direction)
-        
-        # Check if move is valid using your existing board logic
-        if not self.board.has_wall(current_pos, new_pos):
-            # Valid move
-            self._agent_location = np.array(new_pos)
-            self.player.move(new_pos[0], new_pos[1])
-            reward = -1  # Step penalty
-            
-        elif self.player.has_jump():
-            # Invalid move but can jump
-            self._agent_location = np.array(new_pos)
-            self.player.move(new_pos[0], new_pos[1])
-            self.player.dec_jump()
-            reward = -1  # Step penalty
-            
-        else:
-            # Invalid move, can't jump - agent stays in place
-            reward = -1  # Still penalize the attempted move
-        
-        # Check for special tiles, goal, etc.
-        # Check win condition
-        done = False
-        current_pos = tuple(self._agent_location)
-        if self.board.grid[current_pos[0]][current_pos[1]] == TileColor.GREEN:
-            reward += 100  # Big reward for winning
-            done = True
-
-        # reward collecting a jump
-        if self.board.grid[current_pos[0]][current_pos[1]] == TileColor.ORANGE:
-            self.player.inc_jump()
-            self.board.clear_square(current_pos[0], current_pos[1])
-            reward += 5
+        self._agent_location[:] = new_pos
+        self.player.move(*new_pos)
+        self.player.jump_tokens = jumps
+        if picked:
+            self._tile_history.clear_square(*new_pos)
+            self._window_models.clear()
 
-        if self.step_count >= self.max_steps:
-            done = True
-            reward -= 10  # Small penalty for timeout
+        if done and self.telemetry is not None:
+            self._record_episode()
 
         obs = self._get_obs()
         info = {"step_count": self.step_count}
+        if self.optimal_path_length is not None:
+            info["optimal_path_length"] = self.optimal_path_length
            
         return obs, reward, done, False, info  # (obs, reward, terminated, truncated, info)
     
+    def _record_episode(self):
+        # Everything follows from the final state, so steps keep no running totals:
+        # each token taken cleared one square, and jumps start at zero
+        tokens = len(self._tile_history.cleared)
+        won = self.board.get_treasure_pos() == tuple(self._agent_location.tolist())
+        self.telemetry.record(self.episode_index, self.board_seed, self.current_size, self.board.jump_tokens,
+                              self.board.density_walls, episode_return(self.step_count, tokens, won, self.max_steps),
+                              self.step_count, won, tokens - self.player.jump_tokens, tokens)
+
+    def _transition(self, pos, action):
+        """simulate() one step of the agent from `pos`; returns (new position, jumps, picked, reward, done)."""
+        x, y = pos
+        n = self.current_size
+        if self.chunk_size is None:
+            model = self._model
+            cell = x * n + y
+            collected = self._collected
+            occupied = None if self.beasts is None else self.beasts.occupancy.ravel()
+        else:
+            # A chunked board is too large for a whole-board model, so the agent
+            # moves on a model of the 3x3 window around it. Its tiles are the
+            # board's current ones, cleared squares included, so no tokens
+            # count as collected
+            model = self._window_models.get(pos)
+            if model is None:
+                tiles, walls_h, walls_v = self.board.window(x - 1, y - 1, 3, 3)
+                if y == n - 1:
+                    # Moving right from the last column is never blocked, as in Board.has_wall
+                    walls_v[:, 2] = False
+                model = BoardModel(tiles, walls_h, walls_v)
+                if len(self._window_models) >= 4096:
+                    self._window_models.clear()
+                self._window_models[pos] = model
+            cell = 4
+            collected = 0
+            occupied = None
+        state = State(cell, self.player.get_jumps(), self.step_count, collected)
+        next_state, reward, done = simulate(model, state, action, self.max_steps, occupied)
+
+        # What the step did, for instrumentation: wall hit, moved, token taken
+        blocked = bool(model.blocked[cell * 4 + action])
+        moved = bool(next_state.cell != cell)
+        picked = bool(next_state.collected != collected)
+        self.last_step_events = (blocked, moved, picked)
+        if self.chunk_size is None:
+            self._collected = int(next_state.collected)
+            new_pos = divmod(int(next_state.cell), n)
+        else:
+            dx, dy = divmod(int(next_state.cell), 3)
+            new_pos = ((x + dx - 1) % n, (y + dy - 1) % n)
+        return new_pos, int(next_state.jumps), picked, int(reward), bool(done)
+
+    def get_state(self):
+        """Immutable snapshot of the game for set_state, e.g. to branch it in a tree search.
+
+        Costs microseconds: the board is shared rather than copied, and its
+        tiles are recorded as the set of token squares cleared so far.
+        """
+        return EnvState(
+            self.board, self._model, self._tile_history, self._tile_history.cleared, self._collected,
+            tuple(self._agent_location.tolist()), self.player.get_jumps(), self.step_count,
+            self.episode_index, self.board_seed, self.optimal_path_length,
+            None if self.beasts is None else self.beasts.get_state(),
+        )
+
+    def set_state(self, state):
+        """Continue the game from a get_state snapshot, of this episode or an earlier one."""
+        if state.board is not self.board:
+            self.board = state.board
+            self._load_board()
+        self._model = state.model
+        self._window_models.clear()
+        self._collected = state.collected
+        self._tile_history = state.tiles
+        state.tiles.restore(state.cleared)
+        self._agent_location[:] = state.agent
+        self.player.move(*state.agent)
+        self.player.jump_tokens = state.jumps
+        self.step_count = state.step_count
+        self.episode_index = state.episode_index
+        self.board_seed = state.board_seed
+        self.optimal_path_length = state.optimal_path_length
+        if state.beasts is not None:
+            self.beasts = state.beasts.beasts
+            self.beasts.set_state(state.beasts)
+
+    def render(self):
+        """(H, W, 3) uint8 frame of the board and agent when render_mode="rgb_array"."""
+        if self._renderer is None:
+            return None
+        if self.chunk_size is not None:
+            # Only the view_size x view_size window around the agent
+            half = self.view_size // 2
+            x, y = self._agent_location.tolist()
+            tiles, walls_h, walls_v = self.board.window(x - half, y - half, self.view_size, self.view_size)
+            self._renderer.set_board(tiles, walls_h, walls_v)
+            return self._renderer.render(tiles, (half, half))
+        return self._renderer.render(tile_array(self.board), self._agent_location)
+
     def _get_obs(self):
-        return {
-            "agent": self._agent_location,
-            "target": self._target_location, 
-            "board_size": np.array([self.current_size]),
-            "jumps_remaining": np.array([self.player.get_jumps()]),
-            "walls": self._get_wall_representation()
-        }
+        if self.reuse_obs_buffers:
+            self._obs_buffers["agent"][:] = self._agent_location
+            self._obs_buffers["jumps_remaining"][0] = self.player.get_jumps()
+            if self.obs_mode == "egocentric":
+                self._obs_buffers["walls"][:] = self._view_window()
+                self._obs_buffers["target_offset"][:] = self._target_offset()
+            if self.beasts is not None:
+                self._beast_obs(self._obs_buffers["beasts"])
+            obs = self._obs_views
+        else:
+            obs = {
+                "agent": self._agent_location.copy(),
+                "target": self._target_location,
+                "board_size": np.array([self.current_size]),
+                "jumps_remaining": np.array([self.player.get_jumps()]),
+                "walls": self._walls
+            }
+            if self.obs_mode == "egocentric":
+                obs["walls"] = self._view_window()
+                obs["target_offset"] = self._target_offset()
+            if self.beasts is not None:
+                obs["beasts"] = self._beast_obs()
+
+        if self.flatten_obs:
+            return gym.spaces.flatten(self._dict_observation_space, obs).astype(np.float32)
+        return obs
+
+    def _view_window(self):
+        """(view_size, view_size, 4) window of the wall tensor centred on the agent."""
+        x, y = self._agent_location.tolist()
+        if self.chunk_size is not None:
+            half = self.view_size // 2
+            return self.board.wall_window(x - half, y - half, self.view_size)
+        return self._walls[x:x + self.view_size, y:y + self.view_size]
+
+    def _beast_obs(self, out=None):
+        """Beast occupancy laid out like the "walls" observation, written into `out` if given."""
+        if self.obs_mode == "egocentric":
+            half = self.view_size // 2
+            x, y = self._agent_location.tolist()
+            window = self.beasts.window(x - half, y - half, self.view_size)
+            if out is None:
+                return window
+            out[:] = window
+            return out
+        if out is None:
+            out = np.zeros((self.max_size, self.max_size), dtype=np.uint8)
+        n = self.current_size
+        out[:n, :n] = self.beasts.occupancy
+        return out
+
+    def _target_offset(self):
+        n = self.current_size
+        half = n // 2
+        x, y = self._agent_location.tolist()
+        target_x, target_y = self._target_location.tolist()
+        return np.array([(target_x - x + half) % n - half, (target_y - y + half) % n - half])
     
     def _check_if_done(self):
         current_pos = tuple(self._agent_location)
         return self.board.grid[current_pos[0]][current_pos[1]] == TileColor.GREEN
     
     def _get_wall_representation(self):
-        walls = np.zeros((self.max_size, self.max_size, 4), dtype=int)
-        
-        # Direct access to wall set - much faster!
-        for wall in self.board.walls:
-            wall_type, row, col = wall
-            
-            if wall_type == 'h':  # Horizontal wall blocks up/down movement
-                # Horizontal wall below (row, col) blocks downward movement FROM (row, col)
-                if row < self.current_size and col < self.current_size:
-                    walls[row, col, 3] = 1  # Block DOWN from (row, col)
-                # And blocks upward movement TO (row, col) from (row+1, col)
-                if row + 1 < self.current_size and col < self.current_size:
-                    walls[row + 1, col, 1] = 1  # Block UP from (row+1, col)
-                    
-            elif wall_type == 'v':  # Vertical wall blocks left/right movement
-                # Vertical wall to right of (row, col) blocks rightward movement FROM (row, col)
-                if row < self.current_size and col < self.current_size:
-                    walls[row, col, 0] = 1  # Block RIGHT from (row, col)
-                # And blocks leftward movement TO (row, col) from (row, col+1)
-                if row < self.current_size and col + 1 < self.current_size:
-                    walls[row, col + 1, 2] = 1  # Block LEFT from (row, col+1)
-        
-        return walls
\ No newline at end of file
+        n = self.current_size
+        # Pool boards come with their (n, n, 4) uint8 tensor, a view into the pool
+        walls = getattr(self.board, "walls_tensor", None)
+        if walls is None:
+            walls = wall_tensor(*wall_planes(self.board), n, dtype=np.uint8)
+        if self.obs_mode == "egocentric":
+            # Sized by the board rather than max_size, and wrapped around so the
+            # per-step window costs the same on any board size
+            before = self.view_size // 2
+            return np.pad(walls, ((before, self.view_size - 1 - before),) * 2 + ((0, 0),), mode="wrap")
+        if self.max_size > n:
+            walls = np.pad(walls, ((0, self.max_size - n),) * 2 + ((0, 0),))
+        if self.obs_mode == "uint8":
+            # With max_size equal to a pool's board size this is the pool's own tensor
+            return walls
+        if self.obs_mode == "packed":
+            return np.packbits(walls)
+        return walls.astype(int)
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,329 @@
+import argparse
+import os
+import time
+
+import gymnasium as gym
+import numpy as np
+
+from board import TileColor
+from compact_board import CompactBoard, tile_array, wall_planes
+from dynamics import DIRECTIONS, BoardModel, simulate
+
+MAGIC = b"RLEPISOD"
+VERSION = 2
+
+# Fixed part of every episode; the variable-length arrays follow it, see _body_dtype
+HEADER_DTYPE = np.dtype([
+    ("n", "<u2"),
+    ("steps", "<u4"),
+    ("jump_tokens", "<u2"),
+    ("density_walls", "<f4"),
+    ("seed", "<u8"),
+    ("treasure", "<i2", (2,)),
+    ("total_reward", "<i4"),
+    ("won", "u1"),
+    ("max_steps", "<u4"),
+])
+
+ACTION_NAMES = ["RIGHT", "UP", "LEFT", "DOWN"]
+
+
+def _body_dtype(n, steps):
+    """Board arrays and per-step arrays of one episode; walls are packbits(walls_h + walls_v)."""
+    return np.dtype([
+        ("tiles", np.uint8, (n * n,)),
+        ("walls", np.uint8, ((2 * n * n + 7) // 8,)),
+        ("actions", np.uint8, (steps,)),
+        ("rewards", "<i2", (steps,)),
+        ("positions", "<u2", (steps, 2)),
+        ("jumps", np.uint8, (steps,)),
+    ])
+
+
+class Episode:
+    """One recorded episode: the starting board and what happened at every step.
+
+    `positions[t]` and `jumps[t]` are the agent's state after step t.
+    """
+
+    def __init__(self, header, body, index=None):
+        n = int(header["n"])
+        self.index = index
+        self.n = n
+        self.jump_tokens = int(header["jump_tokens"])
+        self.density_walls = float(header["density_walls"])
+        # Board seed reported by MazeWorldEnv.reset (0 if there was none)
+        self.seed = int(header["seed"])
+        self.treasure_pos = tuple(int(v) for v in header["treasure"])
+        self.total_reward = int(header["total_reward"])
+        self.won = bool(header["won"])
+        # Step limit of the env that played it, which decides the timeout penalty
+        self.max_steps = int(header["max_steps"])
+        self.tiles = body["tiles"].reshape(n, n)
+        walls = np.unpackbits(body["walls"], count=2 * n * n).astype(bool)
+        self.walls_h = walls[:n * n].reshape(n, n)
+        self.walls_v = walls[n * n:].reshape(n, n)
+        self.actions = body["actions"]
+        self.rewards = body["rewards"]
+        self.positions = body["positions"]
+        self.jumps = body["jumps"]
+
+    def __len__(self):
+        return len(self.actions)
+
+    def board(self):
+        """Fresh CompactBoard in the episode's starting state."""
+        return CompactBoard.from_arrays(
+            self.tiles.copy(), self.walls_h.copy(), self.walls_v.copy(), self.treasure_pos,
+            jump_tokens=self.jump_tokens, density_walls=self.density_walls,
+        )
+
+    def simulate(self):
+        """Re-run the actions with dynamics.simulate on the board arrays, without an env.
+
+        Returns (rewards, positions, jumps) in the recorded layout; it takes
+        a few microseconds per step.
+        """
+        model = BoardModel(self.tiles, self.walls_h, self.walls_v)
+        steps = len(self.actions)
+        rewards = np.empty(steps, dtype=np.int16)
+        positions = np.empty((steps, 2), dtype=np.uint16)
+        jumps = np.empty(steps, dtype=np.uint8)
+
+        state = model.initial_state()
+        for t, action in enumerate(self.actions.tolist()):
+            state, rewards[t], _ = simulate(model, state, action, self.max_steps)
+            positions[t] = divmod(int(state.cell), self.n)
+            jumps[t] = state.jumps
+        return rewards, positions, jumps
+
+    def replay_env(self, env=None):
+        """Re-run the actions through MazeWorldEnv.step; returns (rewards, positions, jumps)."""
+        if env is None:
+            from environment import MazeWorldEnv
+            env = MazeWorldEnv(min_size=self.n, max_size=max(self.n, 15))
+        env.current_size = self.n
+        env.max_steps = self.max_steps
+        env.reset(options={"board": self.board()})
+        rewards, positions, jumps = [], [], []
+        for action in self.actions.tolist():
+            obs, reward, terminated, truncated, _ = env.step(action)
+            rewards.append(reward)
+            positions.append(tuple(env._agent_location))
+            jumps.append(env.player.get_jumps())
+        return np.array(rewards), np.array(positions), np.array(jumps)
+
+    def verify(self, use_env=False):
+        """True if replaying the actions reproduces the recorded rewards and states."""
+        rewards, positions, jumps = self.replay_env() if use_env else self.simulate()
+        return (np.array_equal(rewards, self.rewards) and np.array_equal(positions, self.positions)
+                and np.array_equal(jumps, self.jumps))
+
+    def print_replay(self, delay=0.0):
+        """Print the board after every step with Board.print_grid."""
+        board = self.board()
+        print(f"Episode {self.index}: {self.n}x{self.n}, {len(self)} steps, reward {self.total_reward}")
+        board.print_grid((0, 0))
+        for t, action in enumerate(self.actions.tolist()):
+            pos = tuple(int(v) for v in self.positions[t])
+            if board.grid[pos[0]][pos[1]] == TileColor.ORANGE:
+                board.clear_square(*pos)
+            print(f"\nStep {t + 1}: {ACTION_NAMES[action]} -> Reward: {self.rewards[t]} | Jumps: {self.jumps[t]}")
+            board.print_grid(pos)
+            if delay:
+                time.sleep(delay)
+
+    def render_frames(self, renderer=None, cell_size=16):
+        """(steps + 1, H, W, 3) uint8 frames of the episode, drawn without a display."""
+        if renderer is None:
+            from rgb_renderer import RgbRenderer
+            renderer = RgbRenderer(cell_size)
+        return renderer.render_episode(self.tiles, self.walls_h, self.walls_v, self.positions)
+
+    def show_gui(self, delay_ms=200):
+        """Replay the actions in the Tk GUI, one move every `delay_ms`."""
+        from mazegui import MazeGameGUI
+
+        gui = MazeGameGUI(self.n, self.jump_tokens, self.density_walls, self.board())
+        actions = self.actions.tolist()
+
+        def play(t):
+            if t < len(actions):
+                # The GUI moves by the same (dx, dy) as the env's actions
+                gui.move_player(*DIRECTIONS[actions[t]].tolist())
+                gui.root.after(delay_ms, play, t + 1)
+
+        gui.root.after(delay_ms, play, 0)
+        gui.run()
+
+
+class EpisodeRecorder(gym.Wrapper):
+    """Wraps a MazeWorldEnv and appends every finished episode to `path`.
+
+    An episode costs a fixed header, the packed starting board and 7 bytes
+    per step. Episodes cut short by `close` are written as well.
+    """
+
+    def __init__(self, env, path):
+        super().__init__(env)
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC + VERSION.to_bytes(4, "little"))
+        else:
+            _check_header(path, bytes(np.fromfile(path, dtype=np.uint8, count=len(MAGIC) + 4)))
+        self._episode = None
+
+    def reset(self, *, seed=None, options=None):
+        self._write_episode()
+        obs, info = self.env.reset(seed=seed, options=options)
+        base = self.env.unwrapped
+        board = base.board
+        walls_h, walls_v = wall_planes(board)
+        self._episode = {
+            "board": (tile_array(board).copy(), walls_h, walls_v),
+            "n": board.n,
+            "jump_tokens": board.jump_tokens,
+            "density_walls": board.density_walls,
+            "seed": info.get("board_seed", 0),
+            "max_steps": base.max_steps,
+            "treasure": board.get_treasure_pos(),
+            "actions": [], "rewards": [], "positions": [], "jumps": [],
+            "won": False,
+        }
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        base = self.env.unwrapped
+        episode = self._episode
+        episode["actions"].append(int(action))
+        episode["rewards"].append(reward)
+        episode["positions"].append(tuple(base._agent_location))
+        episode["jumps"].append(base.player.get_jumps())
+        if terminated or truncated:
+            x, y = episode["positions"][-1]
+            episode["won"] = tile_array(base.board)[x, y] == TileColor.GREEN.value
+            self._write_episode()
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self._write_episode()
+        self._file.close()
+        super().close()
+
+    def _write_episode(self):
+        episode = self._episode
+        self._episode = None
+        if episode is None or not episode["actions"]:
+            return
+        n, steps = episode["n"], len(episode["actions"])
+        header = np.zeros((), dtype=HEADER_DTYPE)
+        header["n"] = n
+        header["steps"] = steps
+        header["jump_tokens"] = episode["jump_tokens"]
+        header["density_walls"] = episode["density_walls"]
+        header["seed"] = episode["seed"]
+        header["treasure"] = episode["treasure"]
+        header["total_reward"] = sum(episode["rewards"])
+        header["won"] = episode["won"]
+        header["max_steps"] = episode["max_steps"]
+
+        tiles, walls_h, walls_v = episode["board"]
+        body = np.zeros((), dtype=_body_dtype(n, steps))
+        body["tiles"] = tiles.ravel()
+        body["walls"] = np.packbits(np.concatenate([walls_h.ravel(), walls_v.ravel()]))
+        body["actions"] = episode["actions"]
+        body["rewards"] = episode["rewards"]
+        body["positions"] = episode["positions"]
+        body["jumps"] = episode["jumps"]
+        self._file.write(header.tobytes() + body.tobytes())
+        self._file.flush()
+
+
+class EpisodeFile:
+    """Read-only, memory-mapped view of the episodes appended by EpisodeRecorder."""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        _check_header(path, bytes(self.data[:len(MAGIC) + 4]))
+
+        # Byte offset of every complete episode
+        self.offsets = []
+        offset = len(MAGIC) + 4
+        while offset + HEADER_DTYPE.itemsize <= len(self.data):
+            header = np.frombuffer(self.data, HEADER_DTYPE, count=1, offset=offset)[0]
+            end = offset + HEADER_DTYPE.itemsize + _body_dtype(int(header["n"]), int(header["steps"])).itemsize
+            if end > len(self.data):
+                break
+            self.offsets.append(offset)
+            offset = end
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        offset = self.offsets[index]
+        header = np.frombuffer(self.data, HEADER_DTYPE, count=1, offset=offset)[0]
+        body_dtype = _body_dtype(int(header["n"]), int(header["steps"]))
+        body = np.frombuffer(self.data, body_dtype, count=1, offset=offset + HEADER_DTYPE.itemsize)[0]
+        return Episode(header, body, index=index % len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def headers(self):
+        """Structured array of every episode header, without touching the bodies."""
+        return np.array([np.frombuffer(self.data, HEADER_DTYPE, count=1, offset=offset)[0]
+                         for offset in self.offsets], dtype=HEADER_DTYPE)
+
+
+def _check_header(path, header):
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an episode file")
+    version = int.from_bytes(header[len(MAGIC):], "little")
+    if version != VERSION:
+        raise ValueError(f"Unsupported episode file version {version}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List, verify and replay recorded episodes")
+    parser.add_argument("path", help="Episode file written by EpisodeRecorder")
+    parser.add_argument("-i", "--index", type=int, help="Episode to replay")
+    parser.add_argument("--gui", action="store_true", help="Replay in the Tk GUI instead of the terminal")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between replayed steps")
+    parser.add_argument("--verify", action="store_true", help="Check that every episode replays identically")
+    parser.add_argument("--frames", help="With -i, save the episode's (T, H, W, 3) RGB frames to this .npy file")
+
+    args = parser.parse_args(argv)
+    episodes = EpisodeFile(args.path)
+    if args.verify:
+        start = time.perf_counter()
+        failed = [episode.index for episode in episodes if not episode.verify()]
+        steps = int(episodes.headers()["steps"].sum()) if len(episodes) else 0
+        print(f"Replayed {len(episodes)} episodes ({steps} steps) in {time.perf_counter() - start:.2f}s")
+        if failed:
+            print(f"{len(failed)} episode(s) did not match: {failed[:20]}")
+    elif args.index is not None:
+        episode = episodes[args.index]
+        if args.frames:
+            np.save(args.frames, episode.render_frames())
+        elif args.gui:
+            episode.show_gui(int(args.delay * 1000) or 200)
+        else:
+            episode.print_replay(args.delay)
+    else:
+        headers = episodes.headers()
+        for index, header in enumerate(headers):
+            print(f"{index:>6} n={header['n']:<4} steps={header['steps']:<4} reward={header['total_reward']:<5}"
+                  f" {'won' if header['won'] else 'lost'}")
+        if len(headers):
+            print(f"{len(headers)} episodes, {headers['won'].mean():.1%} won,"
+                  f" mean reward {headers['total_reward'].mean():.1f}")
+
+
+if __name__ == "__main__":
+    main()
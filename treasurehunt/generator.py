@@ -0,0 +1,228 @@
+from collections import namedtuple
+import time
+
+import numpy as np
+
+from board import Board, TileColor
+from compact_board import CompactBoard
+
+# Stacked arrays for K boards: tiles (K, n, n) uint8, walls_h / walls_v
+# (K, n, n) bool and treasure_pos (K, 2)
+BoardBatch = namedtuple("BoardBatch", ["tiles", "walls_h", "walls_v", "treasure_pos"])
+
+_BLUE = TileColor.BLUE.value
+_YELLOW = TileColor.YELLOW.value
+_ORANGE = TileColor.ORANGE.value
+_GREEN = TileColor.GREEN.value
+
+# (dx, dy) offsets of the 3x3 square coloured around a jump token
+_SQUARE_DX, _SQUARE_DY = (offsets.ravel() for offsets in np.mgrid[-1:2, -1:2])
+
+# Independent streams of seeded_uniforms; token round t uses _TOKEN_STREAM + t
+_PARAMS_STREAM = 0
+_WALL_STREAM = 1
+_TREASURE_STREAM = 2
+_LEVEL_STREAM = 3
+_TOKEN_STREAM = 16
+
+# splitmix64 constants, as NumPy scalars so uint64 arithmetic stays unsigned
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_SHIFT30, _SHIFT27, _SHIFT31, _SHIFT11 = (np.uint64(shift) for shift in (30, 27, 31, 11))
+
+# Memory budget of one generate_boards call when making many boards, see boards_per_chunk
+CHUNK_BYTES = 128 * 1024 * 1024
+
+
+def generate_boards(k, n, jump_tokens, density_walls, rng=None, seeds=None):
+    """Generate K boards of size n in one call, returned as a BoardBatch.
+
+    `jump_tokens` and `density_walls` are scalars or length-K arrays. Walls
+    are drawn straight from the flattened index space of the 2n(n-1) possible
+    walls (horizontal walls first, same positions as Board.insert_walls), and
+    tokens and the treasure are drawn from the cells that are still free, so
+    there are no rejection loops.
+
+    Every random draw of board i comes from `seeds[i]` (see board_seed), so a
+    board does not depend on the others in the batch and can be rebuilt on
+    its own. Without `seeds` they are drawn from `rng`.
+    """
+    if seeds is None:
+        seeds = _default_rng(rng).integers(0, 2 ** 64, size=k, dtype=np.uint64)
+    seeds = np.asarray(seeds, dtype=np.uint64).reshape(k)
+    jump_tokens = np.broadcast_to(np.asarray(jump_tokens, dtype=int), (k,))
+    density_walls = np.broadcast_to(np.asarray(density_walls, dtype=float), (k,))
+    boards = np.arange(k)
+
+    tiles = np.full((k, n, n), _BLUE, dtype=np.uint8)
+    flat_tiles = tiles.reshape(k, n * n)
+
+    # Jump tokens, one round per token so later tokens see earlier ones
+    for token in range(int(jump_tokens.max(initial=0))):
+        placing = boards[jump_tokens > token]
+        # Same rule as Board.insert_jump: any non-yellow cell, or the start cell
+        free = flat_tiles[placing] != _YELLOW
+        free[:, 0] = True
+        cells = _choose_cells(free, seeds[placing], _TOKEN_STREAM + token)
+        x, y = cells // n, cells % n
+        tiles[placing[:, None], (x[:, None] + _SQUARE_DX) % n, (y[:, None] + _SQUARE_DY) % n] = _YELLOW
+        tiles[placing, x, y] = _ORANGE
+
+    # Walls
+    num_horizontal = (n - 1) * n
+    num_possible = 2 * num_horizontal
+    num_walls = np.minimum((n ** 2 * density_walls).astype(int), num_possible)
+    # The walls with the smallest random keys form a uniform sample of each board's index space
+    keys = seeded_uniforms(seeds, _WALL_STREAM, num_possible)
+    if k == 1:
+        selected = np.argpartition(keys[0], num_walls[0] - 1)[:num_walls[0]] if num_walls[0] else np.zeros(0, int)
+        wall_boards = np.zeros(len(selected), dtype=int)
+    else:
+        order = np.argsort(keys, axis=1)
+        chosen = np.arange(num_possible) < num_walls[:, None]
+        wall_boards = np.broadcast_to(boards[:, None], (k, num_possible))[chosen]
+        selected = order[chosen]
+
+    walls_h = np.zeros((k, n, n), dtype=bool)
+    walls_v = np.zeros((k, n, n), dtype=bool)
+    is_horizontal = selected < num_horizontal
+    horizontal = selected[is_horizontal]
+    vertical = selected[~is_horizontal] - num_horizontal
+    walls_h[wall_boards[is_horizontal], horizontal // n, horizontal % n] = True
+    walls_v[wall_boards[~is_horizontal], vertical // (n - 1), vertical % (n - 1)] = True
+
+    # Treasure on a blue cell other than the start
+    free = flat_tiles == _BLUE
+    free[:, 0] = False
+    cells = _choose_cells(free, seeds, _TREASURE_STREAM)
+    flat_tiles[boards, cells] = _GREEN
+    treasure_pos = np.stack([cells // n, cells % n], axis=1)
+
+    return BoardBatch(tiles, walls_h, walls_v, treasure_pos)
+
+
+def boards_per_chunk(n, budget=CHUNK_BYTES):
+    """Boards per generate_boards call that keep its wall keys and their sort order within `budget` bytes.
+
+    Each board holds 2n(n-1) float64 keys plus their int64 argsort, and the
+    peak is about twice that again, so a fixed board count would need
+    gigabytes once boards are a few hundred cells wide.
+    """
+    return max(1, budget // (2 * n * n * 16))
+
+
+def generate_board(n, jump_tokens, density_walls, rng=None, seed=None):
+    """Generate a single CompactBoard with the vectorized generator."""
+    batch = generate_boards(1, n, jump_tokens, density_walls, rng, None if seed is None else [seed])
+    return CompactBoard.from_arrays(
+        batch.tiles[0], batch.walls_h[0], batch.walls_v[0], batch.treasure_pos[0],
+        jump_tokens=jump_tokens, density_walls=density_walls,
+    )
+
+
+def episode_boards(n, seeds):
+    """Boards drawn the way MazeWorldEnv draws them, one per seed.
+
+    Each board gets 0-3 jump tokens and a wall density in [0.5, 0.8), also
+    taken from its seed. Returns (BoardBatch, jump_tokens, density_walls).
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    params = seeded_uniforms(seeds, _PARAMS_STREAM, 2)
+    jump_tokens = (params[:, 0] * 4).astype(int)
+    density_walls = 0.5 + 0.3 * params[:, 1]
+    return generate_boards(len(seeds), n, jump_tokens, density_walls, seeds=seeds), jump_tokens, density_walls
+
+
+def episode_levels(seeds, num_levels):
+    """Level store index MazeWorldEnv plays for each board seed, uniform over the store."""
+    return (seeded_uniforms(seeds, _LEVEL_STREAM, 1)[:, 0] * num_levels).astype(int)
+
+
+def board_seed(base_seed, index):
+    """64-bit seed for board `index` of the board stream derived from `base_seed`.
+
+    Depends only on the pair, so any board can be rebuilt on its own with
+    `generate_board(..., seed=board_seed(base_seed, index))`.
+    """
+    return int(board_seeds(base_seed, [index])[0])
+
+
+def board_seeds(base_seed, indices):
+    """Vectorized board_seed for an array of board indices."""
+    key = _mix64(np.array([base_seed % 2 ** 64], dtype=np.uint64) + _GAMMA)
+    return _mix64(key + (np.asarray(indices, dtype=np.uint64) + np.uint64(1)) * _GAMMA)
+
+
+def seeded_uniforms(seeds, stream, count, start=0):
+    """(len(seeds), count) uniform floats in [0, 1), counter-based.
+
+    Value j of row i is a splitmix64 hash of (seeds[i], stream, start + j), so
+    every row is reproducible from its seed alone and all rows are drawn at once.
+    """
+    counters = np.arange((stream << 32) + start + 1, (stream << 32) + start + count + 1, dtype=np.uint64)
+    z = _mix64(np.asarray(seeds, dtype=np.uint64)[:, None] + counters * _GAMMA)
+    z >>= _SHIFT11
+    return z * (1.0 / (1 << 53))
+
+
+def _mix64(z):
+    """splitmix64 finalizer, in place on a uint64 array (arithmetic wraps around)."""
+    z ^= z >> _SHIFT30
+    z *= _MIX1
+    z ^= z >> _SHIFT27
+    z *= _MIX2
+    z ^= z >> _SHIFT31
+    return z
+
+
+def _choose_cells(free, seeds, stream, candidates=16):
+    """Pick one uniformly random True column per row of `free`.
+
+    Each row first tries `candidates` random cells and keeps the first free
+    one; rows that miss (mostly full boards) rank every cell by a random key
+    instead. Rows without a free cell fall back to an arbitrary cell rather
+    than looping forever like the rejection samplers in Board.
+    """
+    rows, cells = free.shape
+    tries = (seeded_uniforms(seeds, stream, candidates) * cells).astype(int)
+    hits = free[np.arange(rows)[:, None], tries]
+    chosen = tries[np.arange(rows), hits.argmax(axis=1)]
+
+    missed = ~hits.any(axis=1)
+    if missed.any():
+        keys = np.where(free[missed], seeded_uniforms(seeds[missed], stream, cells, start=candidates), -1.0)
+        chosen[missed] = keys.argmax(axis=1)
+    return chosen
+
+
+def _default_rng(rng):
+    # Without an explicit generator or seeds, derive one from NumPy's global state
+    if rng is None:
+        return np.random.default_rng(np.random.randint(2 ** 31))
+    return rng
+
+
+def time_generation(sizes=(8, 16, 32, 64, 128, 256, 512, 1024), jump_tokens=3, density_walls=0.6, batch=64):
+    """Print Board, CompactBoard and generator timings for each board size."""
+    print(f"{'n':>6} {'Board':>12} {'CompactBoard':>14} {'generate_board':>16} {'per board in batch':>20}")
+    for n in sizes:
+        repeats = max(1, 2048 // n)
+        board_time = _time_per_call(lambda: Board(n, jump_tokens, density_walls), max(1, repeats // 8))
+        compact_time = _time_per_call(lambda: CompactBoard(n, jump_tokens, density_walls), repeats)
+        single_time = _time_per_call(lambda: generate_board(n, jump_tokens, density_walls), repeats)
+        k = max(1, batch * 64 // n)
+        batch_time = _time_per_call(lambda: generate_boards(k, n, jump_tokens, density_walls), max(1, repeats // k)) / k
+        print(f"{n:>6} {board_time * 1e3:>10.3f}ms {compact_time * 1e3:>12.3f}ms "
+              f"{single_time * 1e3:>14.3f}ms {batch_time * 1e3:>18.3f}ms")
+
+
+def _time_per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    time_generation()
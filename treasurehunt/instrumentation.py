@@ -0,0 +1,247 @@
+import time
+
+PHASES = ("step", "reset", "board_generation", "observation", "transition", "clear_square", "step_other")
+COUNTERS = ("steps", "resets", "episodes", "jumps_spent", "tokens_collected", "wall_hits")
+
+# Durations are bucketed by bit length of their nanosecond count
+NUM_BUCKETS = 64
+
+
+class Histogram:
+    """Log2-bucketed histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, ns):
+        self.buckets[min(ns.bit_length(), NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other):
+        for i, value in enumerate(other.buckets):
+            self.buckets[i] += value
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Upper bound (in ns) of the bucket holding the q-th percentile."""
+        if self.count == 0:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for bits, value in enumerate(self.buckets):
+            seen += value
+            if seen >= rank and value:
+                return min((1 << bits) - 1, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def to_dict(self):
+        return {"buckets": list(self.buckets), "count": self.count, "total": self.total,
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.buckets = list(data["buckets"])
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class Instrumentation:
+    """Per-phase timing histograms and event counters for MazeWorldEnv.
+
+    Nothing in the envs refers to this class: `attach(env)` wraps the env's
+    (and each new board's) methods on the instance, so an env created without
+    instrumentation runs exactly the same code as before. Snapshots from
+    several processes combine with `merge`, and with `dump_interval` set a
+    summary is passed to `dump` at most that often (checked on reset).
+    """
+
+    def __init__(self, dump_interval=None, dump=print):
+        self.dump_interval = dump_interval
+        self.dump = dump
+        self.reset()
+
+    def reset(self):
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.started = time.time()
+        self._last_dump = time.monotonic()
+
+    def record(self, phase, ns):
+        self.histograms[phase].add(ns)
+
+    def count(self, counter, value=1):
+        self.counters[counter] += value
+
+    def maybe_dump(self):
+        if self.dump_interval is not None and time.monotonic() - self._last_dump >= self.dump_interval:
+            self._last_dump = time.monotonic()
+            self.dump(self.summary())
+
+    def merge(self, other):
+        """Add another Instrumentation (or its to_dict snapshot) into this one."""
+        if isinstance(other, dict):
+            other = Instrumentation.from_dict(other)
+        for phase, histogram in other.histograms.items():
+            self.histograms.setdefault(phase, Histogram()).merge(histogram)
+        for counter, value in other.counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+        return self
+
+    def to_dict(self):
+        return {"histograms": {phase: h.to_dict() for phase, h in self.histograms.items()},
+                "counters": dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, data):
+        instrumentation = cls()
+        instrumentation.histograms = {phase: Histogram.from_dict(h) for phase, h in data["histograms"].items()}
+        instrumentation.counters = dict(data["counters"])
+        return instrumentation
+
+    def summary(self):
+        lines = ["Env instrumentation: " + ", ".join(f"{k}={v}" for k, v in self.counters.items())]
+        step_total = self.histograms["step"].total
+        for phase, h in self.histograms.items():
+            if h.count == 0:
+                continue
+            share = f" {100 * h.total / step_total:5.1f}% of step" if step_total and phase not in ("step", "reset") else ""
+            lines.append(
+                f"  {phase:<17} n={h.count:<10} mean={h.mean / 1e3:9.2f}us "
+                f"p50<={h.percentile(50) / 1e3:9.2f}us p99<={h.percentile(99) / 1e3:9.2f}us{share}"
+            )
+        return "\n".join(lines)
+
+    def attach(self, env):
+        """Start recording `env` (a MazeWorldEnv or VectorMazeWorldEnv)."""
+        if hasattr(env, "num_envs"):
+            _attach_vector_env(self, env)
+        else:
+            _attach_env(self, env)
+        env.instrumentation = self
+        return env
+
+
+def _timed(instrumentation, phase, fn):
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        result = fn(*args, **kwargs)
+        instrumentation.record(phase, clock() - start)
+        return result
+
+    return wrapper
+
+
+def _attach_env(instrumentation, env):
+    clock = time.perf_counter_ns
+    step = env.step
+    reset = env.reset
+    new_board = env._new_board
+    get_obs = env._get_obs
+    # Time spent in the inner phases during the current step, so the rest of
+    # the step (beasts, bookkeeping) can be reported as step_other
+    inner = [0]
+
+    def timed_inner(phase, fn):
+        def wrapper(*args):
+            start = clock()
+            result = fn(*args)
+            elapsed = clock() - start
+            instrumentation.record(phase, elapsed)
+            inner[0] += elapsed
+            return result
+        return wrapper
+
+    def instrumented_step(action):
+        inner[0] = 0
+        start = clock()
+        result = step(action)
+        elapsed = clock() - start
+        instrumentation.record("step", elapsed)
+        instrumentation.record("step_other", max(elapsed - inner[0], 0))
+        instrumentation.count("steps")
+        blocked, moved, picked = env.last_step_events
+        instrumentation.count("wall_hits", blocked)
+        instrumentation.count("jumps_spent", blocked and moved)
+        instrumentation.count("tokens_collected", picked)
+        if result[2] or result[3]:
+            instrumentation.count("episodes")
+        return result
+
+    def instrumented_reset(*args, **kwargs):
+        start = clock()
+        result = reset(*args, **kwargs)
+        instrumentation.record("reset", clock() - start)
+        instrumentation.count("resets")
+
+        # Boards are replaced on every reset, so wrap the new one. A board passed
+        # again with options={"board": ...} already has its wrapper on the instance
+        board = env.board
+        if "clear_square" not in vars(board):
+            board.clear_square = timed_inner("clear_square", board.clear_square)
+        instrumentation.maybe_dump()
+        return result
+
+    env.step = instrumented_step
+    env.reset = instrumented_reset
+    env._new_board = _timed(instrumentation, "board_generation", new_board)
+    env._get_obs = timed_inner("observation", get_obs)
+    env._transition = timed_inner("transition", env._transition)
+
+
+def _attach_vector_env(instrumentation, env):
+    clock = time.perf_counter_ns
+    step = env.step
+    reset = env.reset
+    get_obs = env._get_obs
+    reset_boards = env._reset_boards
+
+    def instrumented_step(actions):
+        start = clock()
+        result = step(actions)
+        instrumentation.record("step", clock() - start)
+        instrumentation.count("steps", env.num_envs)
+        blocked, moved, picked = env.last_step_events
+        instrumentation.count("wall_hits", int(blocked.sum()))
+        instrumentation.count("jumps_spent", int((blocked & moved).sum()))
+        instrumentation.count("tokens_collected", int(picked.sum()))
+        finished = int((result[2] | result[3]).sum())
+        if finished:
+            instrumentation.count("episodes", finished)
+            instrumentation.count("resets", finished)
+            instrumentation.maybe_dump()
+        return result
+
+    def instrumented_reset(*args, **kwargs):
+        start = clock()
+        result = reset(*args, **kwargs)
+        instrumentation.record("reset", clock() - start)
+        instrumentation.count("resets", env.num_envs)
+        return result
+
+    env.step = instrumented_step
+    env.reset = instrumented_reset
+    env._get_obs = _timed(instrumentation, "observation", get_obs)
+    env._reset_boards = _timed(instrumentation, "board_generation", reset_boards)
@@ -0,0 +1,144 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from compact_board import CompactBoard
+from generator import BoardBatch, board_seeds, boards_per_chunk, generate_boards
+
+MAGIC = b"RLLEVELS"
+VERSION = 1
+# Records start on a 64-byte boundary after the magic, header length and JSON header
+HEADER_ALIGN = 64
+
+
+def record_dtype(n):
+    """Fixed-size on-disk record for one n x n board.
+
+    `walls` is np.packbits of walls_h followed by walls_v (each n*n bits) and
+    `seed` regenerates the board with generate_board(..., seed=seed).
+    """
+    return np.dtype([
+        ("tiles", np.uint8, (n * n,)),
+        ("walls", np.uint8, ((2 * n * n + 7) // 8,)),
+        ("treasure", "<i4", (2,)),
+        ("seed", "<u8"),
+    ])
+
+
+def write_level_store(path, count, n, jump_tokens, density_walls, seed=0, verbose=True, chunk_size=None):
+    """Generate `count` boards and write them to `path`.
+
+    Board i is generated from board_seed(seed, i), so every stored board can
+    also be rebuilt on its own. Boards are generated `chunk_size` at a time,
+    by default as many as fit generator.CHUNK_BYTES.
+    """
+    chunk_size = chunk_size or boards_per_chunk(n)
+    header = json.dumps({
+        "version": VERSION,
+        "count": count,
+        "n": n,
+        "jump_tokens": jump_tokens,
+        "density_walls": density_walls,
+        "seed": seed,
+    }).encode()
+    offset = _align(len(MAGIC) + 4 + len(header))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(4, "little"))
+        f.write(header)
+        f.write(b"\0" * (offset - f.tell()))
+
+    records = np.memmap(path, dtype=record_dtype(n), mode="r+", offset=offset, shape=(count,))
+    start = time.perf_counter()
+    for lo in range(0, count, chunk_size):
+        hi = min(lo + chunk_size, count)
+        seeds = board_seeds(seed, np.arange(lo, hi))
+        boards = generate_boards(hi - lo, n, jump_tokens, density_walls, seeds=seeds)
+        chunk = records[lo:hi]
+        chunk["tiles"] = boards.tiles.reshape(hi - lo, n * n)
+        chunk["walls"] = np.packbits(np.concatenate([boards.walls_h.reshape(hi - lo, -1),
+                                                     boards.walls_v.reshape(hi - lo, -1)], axis=1), axis=1)
+        chunk["treasure"] = boards.treasure_pos
+        chunk["seed"] = seeds
+        if verbose and hi // 100000 > lo // 100000:
+            print(f"Wrote {hi}/{count} boards ({time.perf_counter() - start:.1f}s)")
+    records.flush()
+    del records
+    return LevelStore(path)
+
+
+class LevelStore:
+    """Read-only, memory-mapped view of a level file written by write_level_store.
+
+    Nothing is parsed per board: indexing reads the fixed-size record straight
+    from the page cache, so many processes can share one file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a level store")
+            header_len = int.from_bytes(f.read(4), "little")
+            self.header = json.loads(f.read(header_len))
+        if self.header["version"] != VERSION:
+            raise ValueError(f"Unsupported level store version {self.header['version']}")
+
+        self.n = self.header["n"]
+        self.jump_tokens = self.header["jump_tokens"]
+        self.density_walls = self.header["density_walls"]
+        self.records = np.memmap(
+            path, dtype=record_dtype(self.n), mode="r",
+            offset=_align(len(MAGIC) + 4 + header_len), shape=(self.header["count"],),
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def batch(self, indices):
+        """BoardBatch holding copies of the boards at `indices`."""
+        records = self.records[np.asarray(indices)]
+        k, n = len(records), self.n
+        walls = np.unpackbits(records["walls"], axis=1, count=2 * n * n).astype(bool)
+        return BoardBatch(
+            records["tiles"].reshape(k, n, n),
+            walls[:, :n * n].reshape(k, n, n),
+            walls[:, n * n:].reshape(k, n, n),
+            records["treasure"].astype(int),
+        )
+
+    def to_board(self, index):
+        """Board `index` as a CompactBoard, usable by the terminal and Tk frontends."""
+        boards = self.batch([index])
+        return CompactBoard.from_arrays(
+            boards.tiles[0], boards.walls_h[0], boards.walls_v[0], boards.treasure_pos[0],
+            jump_tokens=self.jump_tokens, density_walls=self.density_walls,
+        )
+
+    def seed(self, index):
+        return int(self.records[index]["seed"])
+
+
+def _align(size):
+    return -(-size // HEADER_ALIGN) * HEADER_ALIGN
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pregenerate boards into a memory-mapped level store")
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("-c", "--count", type=int, required=True, help="Number of boards")
+    parser.add_argument("-n", type=int, required=True, help="Board size")
+    parser.add_argument("-j", type=int, required=True, help="Number of jump tokens")
+    parser.add_argument("-d", type=float, required=True, help="Density of Walls")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed")
+
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    store = write_level_store(args.path, args.count, args.n, args.j, args.d, args.seed)
+    print(f"Wrote {len(store)} boards to {args.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,9 @@
 import argparse
 from board import Board, TileColor
 from player import Player
-from mazegui import start_gui_game
+from terminal_renderer import TerminalRenderer
 
-def start(board_size, num_jumps, density_walls, mode):
+def start(board_size, num_jumps, density_walls, mode, board=None):
     if (board_size < 5 or num_jumps < 0 or density_walls < 0 or density_walls >= 1 or mode not in [0, 1]):
         print(f"Board size (n) must be greater than 5.")
         print(f"Jump tokens (j) must be greater than 0.")
@@ -21,17 +21,22 @@ def start(board_size, num_jumps, density_walls, mode):
 
     if (mode == 0):
         print(f"Starting terminal game...")
-        start_terminal_game(board_size, num_jumps, density_walls)
+        start_terminal_game(board_size, num_jumps, density_walls, board)
 
     else:
         print(f"Starting gui game...")
-        start_gui_game(board_size, num_jumps, density_walls)
-
-def start_terminal_game(board_size, num_jumps, density_walls):
-    board = Board(board_size, num_jumps, density_walls)
-    board.show_stats()
+        # tkinter is only loaded for the GUI
+        from mazegui import start_gui_game
+        start_gui_game(board_size, num_jumps, density_walls, board)
+
+def start_terminal_game(board_size, num_jumps, density_walls, board=None):
+    if board is None:
+        board = Board(board_size, num_jumps, density_walls)
+    renderer = TerminalRenderer(board)
     player = Player()
     player_pos = player.get_pos()
+    renderer.render(player_pos, f"Size: {board.n}x{board.n} | Jump tokens: {board.jump_tokens} | "
+                                f"Walls: {len(board.walls)} | Type 'h' for help")
 
     while (board.grid[player_pos[0]][player_pos[1]] != TileColor.GREEN):
         move = input("Your move (w/a/s/d/h/q): ").strip().lower()
@@ -80,23 +85,23 @@ def start_terminal_game(board_size, num_jumps, density_walls):
         # Check if move is blocked by wall
         if not board.has_wall(player_pos, new_pos):
             # Move is not blocked, proceed normally
-            move_player(player=player, board=board, new_pos=new_pos)
+            message = move_player(player=player, board=board, new_pos=new_pos)
         elif player.has_jump():
             # Move is blocked but player can jump
-            print("Jump over wall!")  
             player.dec_jump()
-            move_player(player=player, board=board, new_pos=new_pos)
+            message = "Jump over wall! " + move_player(player=player, board=board, new_pos=new_pos)
         else:
             # Move is blocked and no jumps available
-            print("Blocked by a wall!")
+            renderer.render(player_pos, "Blocked by a wall!")
             continue
         
         # After successful move, check for special tiles
         player_pos = player.get_pos()
         if board.grid[player_pos[0]][player_pos[1]] == TileColor.ORANGE:
-            print("Acquired a jump!")
+            message += " Acquired a jump!"
             player.inc_jump()
             board.clear_square(player_pos[0], player_pos[1])
+        renderer.render(player_pos, f"{message} | Jumps: {player.get_jumps()}")
 
     print("🎉 You found the treasure! 🎉")
 
@@ -104,19 +109,38 @@ def move_player(player, board, new_pos):
     new_x, new_y = new_pos
     player.move(new_x, new_y)
     player_pos = player.get_pos()
-    print(f"Moved to {player_pos}. Tile: {board.grid[player_pos[0]][player_pos[1]].name}")
-    board.print_grid(player_pos)
+    return f"Moved to {player_pos}. Tile: {board.grid[player_pos[0]][player_pos[1]].name}"
 
-def main():
+def main(argv=None, mode=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument("-n", type=int, required=True, help="Board size")
-    parser.add_argument("-j", type=int, required=True, help="Number of jump tokens")
-    parser.add_argument("-d", type=float, required=True, help="Density of Walls")
-    parser.add_argument("-t", type=int, choices=[0, 1], required=True, help="Mode: 1 for terminal, 0 for GUI")
+    parser.add_argument("-n", type=int, help="Board size")
+    parser.add_argument("-j", type=int, help="Number of jump tokens")
+    parser.add_argument("-d", type=float, help="Density of Walls")
+    if mode is None:
+        parser.add_argument("-t", type=int, choices=[0, 1], required=True, help="Mode: 0 for terminal, 1 for GUI")
+    parser.add_argument("-l", "--levels", help="Level store to load the board from instead of generating one")
+    parser.add_argument("-i", "--level", type=int, default=0, help="Index of the board in the level store")
+
+    args = parser.parse_args(argv)
+    if mode is not None:
+        args.t = mode
+    if args.levels is not None:
+        # Only needed here, so the plain game does not pay for importing NumPy
+        from level_store import LevelStore
+        store = LevelStore(args.levels)
+        start(store.n, store.jump_tokens, store.density_walls, args.t, store.to_board(args.level))
+    elif args.n is None or args.j is None or args.d is None:
+        parser.error("-n, -j and -d are required unless --levels is given")
+    else:
+        start(args.n, args.j, args.d, args.t)
+
+
+def play_main(argv=None):
+    main(argv, mode=0)
 
-    args = parser.parse_args()
-    start(args.n, args.j, args.d, args.t)
 
+def gui_main(argv=None):
+    main(argv, mode=1)
 
 
 if __name__ == "__main__":
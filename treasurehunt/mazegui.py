@@ -6,8 +6,8 @@ from board import Board, TileColor
 from player import Player
 
 class MazeGameGUI:
-    def __init__(self, board_size, num_jumps, density_walls):
-        self.board = Board(board_size, num_jumps, density_walls)
+    def __init__(self, board_size, num_jumps, density_walls, board=None, view_cells=20):
+        self.board = board if board is not None else Board(board_size, num_jumps, density_walls)
         self.player = Player()
         self.player_pos = self.player.get_pos()
         
@@ -27,8 +27,15 @@ class MazeGameGUI:
         
         # Calculate cell size based on board size
         self.cell_size = max(40, 400 // board_size)
+
+        # Canvas items only exist for a view_cells x view_cells window of the
+        # board, created once; larger boards scroll the window (wrapping like
+        # the board) to follow the player, so a move costs the same at any n
+        self.view_cells = min(self.board.n, view_cells)
+        self.view_origin = (0, 0)
         
         self.setup_ui()
+        self.create_items()
         self.draw_board()
         
         # Bind keyboard events
@@ -61,8 +68,8 @@ class MazeGameGUI:
         instructions.pack()
         
         # Canvas for the game board
-        canvas_width = self.board.n * self.cell_size + 1
-        canvas_height = self.board.n * self.cell_size + 1
+        canvas_width = self.view_cells * self.cell_size + 1
+        canvas_height = self.view_cells * self.cell_size + 1
         
         self.canvas = tk.Canvas(
             self.root,
@@ -74,80 +81,113 @@ class MazeGameGUI:
         )
         self.canvas.pack(padx=20, pady=20)
         
+    def create_items(self):
+        """Create the cell, player and wall items of every view slot."""
+        size = self.cell_size
+        wall_width = 4
+        self.cell_items = [
+            [self.canvas.create_rectangle(j * size, i * size, (j + 1) * size, (i + 1) * size,
+                                          outline="#2C3E50", width=1)
+             for j in range(self.view_cells)]
+            for i in range(self.view_cells)
+        ]
+
+        radius = size // 3
+        self.player_oval = self.canvas.create_oval(
+            size // 2 - radius, size // 2 - radius, size // 2 + radius, size // 2 + radius,
+            fill="#8E44AD", outline="#6C3483", width=3
+        )
+        self.player_text = self.canvas.create_text(
+            size // 2, size // 2,
+            text="P",
+            fill="white",
+            font=("Arial", max(8, size // 4), "bold")
+        )
+
+        # One horizontal (below the cell) and one vertical (left of the cell)
+        # wall item per slot, shown or hidden by draw_walls
+        self.h_wall_items = [
+            [self.canvas.create_rectangle(j * size, (i + 1) * size - wall_width // 2,
+                                          (j + 1) * size, (i + 1) * size + wall_width // 2,
+                                          fill="#C0392B", outline="#A93226", width=1, state=tk.HIDDEN)
+             for j in range(self.view_cells)]
+            for i in range(self.view_cells)
+        ]
+        self.v_wall_items = [
+            [self.canvas.create_rectangle(j * size - wall_width // 2, i * size,
+                                          j * size + wall_width // 2, (i + 1) * size,
+                                          fill="#C0392B", outline="#A93226", width=1, state=tk.HIDDEN)
+             for j in range(self.view_cells)]
+            for i in range(self.view_cells)
+        ]
+
     def draw_board(self):
-        self.canvas.delete("all")
-        
-        # Draw grid cells
-        for i in range(self.board.n):
-            for j in range(self.board.n):
-                x1 = j * self.cell_size
-                y1 = i * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                # Get tile color
-                tile_color = self.colors[self.board.grid[i][j]]
-                
-                # Draw cell
-                self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill=tile_color,
-                    outline="#2C3E50",
-                    width=1
-                )
-                
-                # Draw player
-                if (i, j) == self.player_pos:
-                    center_x = x1 + self.cell_size // 2
-                    center_y = y1 + self.cell_size // 2
-                    radius = self.cell_size // 3
-                    
-                    self.canvas.create_oval(
-                        center_x - radius, center_y - radius,
-                        center_x + radius, center_y + radius,
-                        fill="#8E44AD", outline="#6C3483", width=3
-                    )
-                    
-                    # Player symbol
-                    self.canvas.create_text(
-                        center_x, center_y,
-                        text="P",
-                        fill="white",
-                        font=("Arial", max(8, self.cell_size // 4), "bold")
-                    )
-        
-        # Draw walls
+        """Refresh every slot of the view; moves normally update only what changed."""
+        origin_x, origin_y = self.view_origin
+        n = self.board.n
+        for i in range(self.view_cells):
+            row = self.board.grid[(origin_x + i) % n]
+            for j in range(self.view_cells):
+                tile_color = self.colors[row[(origin_y + j) % n]]
+                self.canvas.itemconfig(self.cell_items[i][j], fill=tile_color)
+
         self.draw_walls()
-        
+        self.draw_player()
+
     def draw_walls(self):
-        wall_width = 4
-        
-        for wall in self.board.walls:
-            wall_type, row, col = wall
-            
-            if wall_type == 'h':  # Horizontal wall
-                # Wall below cell (row, col)
-                x1 = col * self.cell_size
-                y1 = (row + 1) * self.cell_size - wall_width // 2
-                x2 = x1 + self.cell_size
-                y2 = y1 + wall_width
-                
-                self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill="#C0392B", outline="#A93226", width=1
-                )
-                
-            elif wall_type == 'v':  # Vertical wall
-                # Wall to the left of cell (row, col)
-                x1 = col * self.cell_size - wall_width // 2
-                y1 = row * self.cell_size
-                x2 = x1 + wall_width
-                y2 = y1 + self.cell_size
-                
-                self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill="#C0392B", outline="#A93226", width=1
-                )
+        origin_x, origin_y = self.view_origin
+        n = self.board.n
+        walls = self.board.walls
+        for i in range(self.view_cells):
+            x = (origin_x + i) % n
+            for j in range(self.view_cells):
+                y = (origin_y + j) % n
+                self.canvas.itemconfig(self.h_wall_items[i][j],
+                                       state=tk.NORMAL if ('h', x, y) in walls else tk.HIDDEN)
+                self.canvas.itemconfig(self.v_wall_items[i][j],
+                                       state=tk.NORMAL if ('v', x, y) in walls else tk.HIDDEN)
+
+    def draw_player(self):
+        slot = self.view_slot(self.player_pos)
+        if slot is None:
+            return
+        size = self.cell_size
+        center_x = slot[1] * size + size // 2
+        center_y = slot[0] * size + size // 2
+        radius = size // 3
+        self.canvas.coords(self.player_oval, center_x - radius, center_y - radius,
+                           center_x + radius, center_y + radius)
+        self.canvas.coords(self.player_text, center_x, center_y)
+
+    def draw_cells(self, cells):
+        """Recolour the given board cells, skipping those outside the view."""
+        for pos in cells:
+            slot = self.view_slot(pos)
+            if slot is not None:
+                self.canvas.itemconfig(self.cell_items[slot[0]][slot[1]],
+                                       fill=self.colors[self.board.grid[pos[0]][pos[1]]])
+
+    def view_slot(self, pos):
+        """(row, col) of the view slot showing board cell `pos`, or None if it is off screen."""
+        n = self.board.n
+        i = (pos[0] - self.view_origin[0]) % n
+        j = (pos[1] - self.view_origin[1]) % n
+        if i < self.view_cells and j < self.view_cells:
+            return i, j
+        return None
+
+    def follow_player(self):
+        """Recentre the view if the player got close to its edge; True if it moved."""
+        if self.view_cells == self.board.n:
+            return False
+        margin = self.view_cells // 4
+        slot = self.view_slot(self.player_pos)
+        if slot is not None and all(margin <= v < self.view_cells - margin for v in slot):
+            return False
+        n = self.board.n
+        self.view_origin = ((self.player_pos[0] - self.view_cells // 2) % n,
+                            (self.player_pos[1] - self.view_cells // 2) % n)
+        return True
     
     def on_key_press(self, event):
         # Handle key presses
@@ -208,14 +248,20 @@ class MazeGameGUI:
         if current_tile == TileColor.ORANGE:
             self.show_message("Acquired a jump token!", "success")
             self.player.inc_jump()
-            self.board.clear_square(self.player_pos[0], self.player_pos[1])
+            x, y = self.player_pos
+            self.board.clear_square(x, y)
+            n = self.board.n
+            self.draw_cells([((x + dx) % n, (y + dy) % n) for dx in [-1, 0, 1] for dy in [-1, 0, 1]])
         elif current_tile == TileColor.GREEN:
             self.show_victory()
             return
         
         # Update display
         self.update_stats()
-        self.draw_board()
+        if self.follow_player():
+            self.draw_board()
+        else:
+            self.draw_player()
     
     def update_stats(self):
         self.stats_label.config(
@@ -255,7 +301,7 @@ class MazeGameGUI:
     def run(self):
         self.root.mainloop()
 
-def start_gui_game(board_size, num_jumps, density_walls):
+def start_gui_game(board_size, num_jumps, density_walls, board=None):
     """Start the GUI version of the maze game."""
-    game = MazeGameGUI(board_size, num_jumps, density_walls)
+    game = MazeGameGUI(board_size, num_jumps, density_walls, board)
     game.run()
\ No newline at end of file
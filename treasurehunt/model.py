@@ -1,14 +1,23 @@
+import time
+
 from environment import MazeWorldEnv
 from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
 
 
-def main():
+def main(total_timesteps=100000, telemetry_path=None):
     print(f"Start model process")
-    # Simple training
-    env = MazeWorldEnv(min_size=8, max_size=8)
+    # Simple training, optionally logging every episode to `telemetry_path`
+    telemetry = _telemetry(telemetry_path)
+    env = MazeWorldEnv(min_size=8, max_size=8, telemetry=telemetry)
     model = PPO("MultiInputPolicy", env, verbose=1)
-    model.learn(total_timesteps=100000)
-    model.save("quick_test_model")
+    try:
+        model.learn(total_timesteps=total_timesteps)
+        model.save("quick_test_model")
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+            env.telemetry = None
     
     # Quick test
     obs, _ = env.reset()
@@ -19,35 +28,110 @@ def main():
             print("Agent reached the goal!")
             break
 
-def watch_agent_play(model_path, show_board=True):
+
+def _telemetry(path):
+    if path is None:
+        return None
+    from telemetry import Telemetry
+    return Telemetry(path)
+
+
+class InstrumentationCallback(BaseCallback):
+    """Prints the env instrumentation summary every `interval` seconds of training."""
+
+    def __init__(self, vec_env, interval=60):
+        super().__init__()
+        self.vec_env = vec_env
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        if time.monotonic() - self._last >= self.interval:
+            self._last = time.monotonic()
+            print(self.vec_env.get_instrumentation().summary())
+
+
+def train_vectorized(num_envs=1024, total_timesteps=1000000, num_workers=1, instrument=False, dump_interval=60,
+                     telemetry_path=None):
+    """Train PPO on `num_envs` boards stepped together by VectorMazeWorldEnv.
+
+    With num_workers > 1 the boards are split across worker processes that
+    exchange observations with the trainer through shared memory. With
+    `instrument` the env-side time per phase is summarized every
+    `dump_interval` seconds. With `telemetry_path` (single process only)
+    every finished episode is logged there.
+    """
+    from vector_env import VectorMazeWorldEnv
+    from sb3_vec_env import SB3VectorMazeWorldEnv
+    from subproc_runner import SharedMemoryVectorEnv
+    from instrumentation import Instrumentation
+
+    print(f"Start vectorized model process with {num_envs} envs on {num_workers} worker(s)")
+    callback = None
+    telemetry = None
+    if num_workers > 1:
+        if telemetry_path is not None:
+            raise ValueError("Episode telemetry is only supported with num_workers=1")
+        vec_env = SharedMemoryVectorEnv(num_envs=num_envs, num_workers=num_workers, min_size=8, max_size=8,
+                                        instrument=instrument)
+        if instrument:
+            # Workers keep their own counters; merge them from the trainer
+            callback = InstrumentationCallback(vec_env, dump_interval)
+    else:
+        instrumentation = Instrumentation(dump_interval=dump_interval) if instrument else None
+        telemetry = _telemetry(telemetry_path)
+        vec_env = VectorMazeWorldEnv(num_envs=num_envs, min_size=8, max_size=8, instrumentation=instrumentation,
+                                     telemetry=telemetry)
+    env = SB3VectorMazeWorldEnv(vec_env)
+    try:
+        # A short rollout per env still gives num_envs * n_steps samples per update
+        model = PPO("MultiInputPolicy", env, n_steps=16, batch_size=1024, verbose=1)
+        model.learn(total_timesteps=total_timesteps, callback=callback)
+        model.save("quick_test_model")
+    finally:
+        # Stops the worker processes and frees their shared memory
+        env.close()
+        if telemetry is not None:
+            telemetry.close()
+    return model
+
+def watch_agent_play(model_path, show_board=True, record=None):
+    """Play one episode with the saved model, optionally appending it to the episode file `record`."""
+    from terminal_renderer import TerminalRenderer
+
     model = PPO.load(model_path)
     env = MazeWorldEnv(min_size=8, max_size=8)
+    if record is not None:
+        from episodes import EpisodeRecorder
+        env = EpisodeRecorder(env, record)
     
     obs, _ = env.reset()
     done = False
     step = 0
-    
+
+    # Redraws only the cells that changed between steps
+    renderer = TerminalRenderer(env.unwrapped.board) if show_board else None
     if show_board:
-        print("Initial board:")
-        env.board.print_grid(tuple(obs['agent']))
+        renderer.render(tuple(obs['agent']), "Initial board")
     
     while not done and step < 50:
         action, _ = model.predict(obs, deterministic=True)
-        print(f"Action to take: {action}")
         obs, reward, done, truncated, info = env.step(action)
         step += 1
         
         action_names = ['RIGHT', 'UP', 'LEFT', 'DOWN']
-        print(f"\nStep {step}: {action_names[action]} -> Reward: {reward}")
-        
+        status = f"Step {step}: {action_names[action]} -> Reward: {reward}"
         if show_board:
-            env.board.print_grid(tuple(obs['agent']))
+            renderer.render(tuple(obs['agent']), status)
+        else:
+            print(status)
         
         if done:
             print(f"🎉 Agent won in {step} steps!")
+    env.close()
 
-# Run it
-watch_agent_play("quick_test_model")
-
-# if __name__ == "__main__":
-#     main()
\ No newline at end of file
+if __name__ == "__main__":
+    watch_agent_play("quick_test_model")
\ No newline at end of file
@@ -0,0 +1,188 @@
+import gymnasium as gym
+import numpy as np
+
+from board import TileColor
+from compact_board import CompactBoard, wall_tensor
+from dynamics import STEP_REWARD, TOKEN_REWARD, BoardModel, State, simulate
+from generator import board_seed, episode_boards
+
+
+class MultiAgentMazeEnv:
+    """K leopards racing for the treasure on one shared board.
+
+    Follows PettingZoo's parallel API (`possible_agents`, `agents`,
+    `observation_space(agent)`, `action_space(agent)`, `reset` and `step`
+    with per-agent dicts) without depending on PettingZoo. Positions and
+    jump counts are (K, ...) arrays and `step_arrays` moves all K agents
+    with one dynamics.simulate call; `step` only wraps its results in dicts.
+
+    Rules are MazeWorldEnv's, applied to every agent at once: moves wrap,
+    walls block unless a jump is spent, agents do not block each other.
+    All agents share the board's mask of collected tokens. When several
+    agents land on the same token in one step a random one of them takes
+    it, and every token taken in the step then clears its 3x3 square.
+    Every agent that reaches the treasure in the same step wins it, and the
+    episode ends for all of them at once, as it does on timeout.
+    """
+
+    metadata = {"name": "leopard_vs_leopard_v0"}
+
+    def __init__(self, num_agents=2, size=8, max_steps=200, random_starts=False):
+        self.possible_agents = [f"leopard_{i}" for i in range(num_agents)]
+        self.agents = []
+        self.n = size
+        self.max_steps = max_steps
+        # Start everyone at (0, 0) like Player, or on random cells
+        self.random_starts = random_starts
+        self.step_count = 0
+
+        self.base_seed = int(np.random.SeedSequence().entropy)
+        self.episode_index = -1
+        self.np_random = np.random.default_rng()
+        self.board = None
+        # dynamics.BoardModel of the board as dealt, and the tokens collected on it so far
+        self._model = None
+        self._collected = 0
+
+        # Every agent has the same spaces
+        self._observation_space = gym.spaces.Dict({
+            "agent": gym.spaces.Box(0, size - 1, shape=(2,), dtype=int),
+            "target": gym.spaces.Box(0, size - 1, shape=(2,), dtype=int),
+            "board_size": gym.spaces.Box(size, size, shape=(1,), dtype=int),
+            "jumps_remaining": gym.spaces.Box(0, 3, shape=(1,), dtype=int),
+            "walls": gym.spaces.Box(0, 1, shape=(size, size, 4), dtype=int),
+            # Number of agents on each cell, the observing agent included
+            "occupancy": gym.spaces.Box(0, num_agents, shape=(size, size), dtype=int),
+        })
+        self._action_space = gym.spaces.Discrete(4)
+
+        k = num_agents
+        self._positions = np.zeros((k, 2), dtype=int)
+        self._jumps = np.zeros(k, dtype=int)
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    @property
+    def num_agents(self):
+        return len(self.agents)
+
+    @property
+    def max_num_agents(self):
+        return len(self.possible_agents)
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.base_seed = seed
+            self.episode_index = -1
+            self.np_random = np.random.default_rng(seed)
+        self.episode_index += 1
+        # Board i of the stream is the same board MazeWorldEnv(compact_board=True) plays as episode i
+        boards, jump_tokens, density_walls = episode_boards(self.n, [board_seed(self.base_seed, self.episode_index)])
+        self._tiles = boards.tiles[0]
+        self._model = BoardModel(self._tiles, boards.walls_h[0], boards.walls_v[0])
+        self._collected = 0
+        self._walls = wall_tensor(boards.walls_h[0], boards.walls_v[0], self.n)
+        self._walls.flags.writeable = False
+        self._target = boards.treasure_pos[0]
+        self.board = CompactBoard.from_arrays(self._tiles, boards.walls_h[0], boards.walls_v[0], self._target,
+                                              jump_tokens=int(jump_tokens[0]), density_walls=float(density_walls[0]))
+
+        k = self.max_num_agents
+        if self.random_starts:
+            free = np.flatnonzero(self._tiles.ravel() != TileColor.GREEN.value)
+            cells = free[self.np_random.integers(len(free), size=k)]
+            self._positions[:] = np.stack([cells // self.n, cells % self.n], axis=1)
+        else:
+            self._positions[:] = 0
+        self._jumps[:] = 0
+        self.step_count = 0
+        self.agents = list(self.possible_agents)
+
+        obs = self._get_obs()
+        return self._per_agent(obs), {agent: {} for agent in self.agents}
+
+    def step(self, actions):
+        """PettingZoo parallel step: dicts keyed by agent name in, dicts out."""
+        action_array = np.array([actions[agent] for agent in self.possible_agents])
+        obs, rewards, terminated, truncated, won = self.step_arrays(action_array)
+        agents = self.possible_agents
+        infos = {agent: {"won": bool(won[i]), "step_count": self.step_count} for i, agent in enumerate(agents)}
+        result = (
+            self._per_agent(obs),
+            dict(zip(agents, rewards.tolist())),
+            dict(zip(agents, terminated.tolist())),
+            dict(zip(agents, truncated.tolist())),
+            infos,
+        )
+        if terminated.any() or truncated.any():
+            self.agents = []
+        return result
+
+    def step_arrays(self, actions):
+        """Advance every agent by its action in `actions` (K,).
+
+        Returns (obs, rewards, terminated, truncated, won) where obs is a
+        dict of (K, ...) arrays and the rest are (K,) arrays.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        n = self.n
+        k = len(actions)
+        model = self._model
+
+        # Every agent steps from the board as it is, with the tokens collected on it so far
+        cells = self._positions[:, 0] * n + self._positions[:, 1]
+        collected = np.full(k, self._collected, dtype=object if model.wide else np.int64)
+        state = State(cells, self._jumps, np.full(k, self.step_count), collected)
+        next_state, rewards, terminated = simulate(model, state, actions, self.max_steps)
+        self.step_count += 1
+        # Only a win is worth more than a token, even on the timeout step
+        won = rewards > STEP_REWARD + TOKEN_REWARD
+        jumps = next_state.jumps
+
+        on_token = np.flatnonzero(next_state.collected != collected)
+        if len(on_token):
+            # One random taker per token cell: the first of each cell in a shuffled order.
+            # simulate() let every agent on the cell take it, so the others give it back
+            contenders = self.np_random.permutation(on_token)
+            _, first = np.unique(next_state.cell[contenders], return_index=True)
+            losers = np.setdiff1d(on_token, contenders[first])
+            jumps[losers] -= 1
+            rewards[losers] -= TOKEN_REWARD
+            self._collected = int(np.bitwise_or.reduce(next_state.collected))
+            # Keep the board's tiles current for anyone reading self.board
+            for cell in next_state.cell[contenders[first]].tolist():
+                self.board.clear_square(*divmod(cell, n))
+
+        self._positions[:, 0], self._positions[:, 1] = np.divmod(next_state.cell, n)
+        self._jumps[:] = jumps
+        done = terminated.any()
+        terminated = np.full(k, done)
+        truncated = np.zeros(len(actions), dtype=bool)
+        return self._get_obs(), rewards, terminated, truncated, won
+
+    def _get_obs(self):
+        k = self.max_num_agents
+        occupancy = np.bincount(self._positions[:, 0] * self.n + self._positions[:, 1], minlength=self.n * self.n)
+        return {
+            "agent": self._positions.copy(),
+            "target": np.broadcast_to(self._target, (k, 2)),
+            "board_size": np.full((k, 1), self.n),
+            "jumps_remaining": self._jumps[:, None].copy(),
+            # Every agent sees the same read-only wall tensor
+            "walls": np.broadcast_to(self._walls, (k,) + self._walls.shape),
+            # One (n, n) map shared by all agents rather than a (K, K - 1) list of opponents
+            "occupancy": np.broadcast_to(occupancy.reshape(self.n, self.n), (k, self.n, self.n)),
+        }
+
+    def _per_agent(self, obs):
+        return {agent: {key: value[i] for key, value in obs.items()} for i, agent in enumerate(self.possible_agents)}
+
+    def render(self):
+        return None
+
+    def close(self):
+        pass
@@ -0,0 +1,162 @@
+import argparse
+import time
+import weakref
+
+import numpy as np
+
+from board import TileColor
+from dynamics import STEP_REWARD, TIMEOUT_REWARD, TOKEN_REWARD, WIN_REWARD
+from solver import solve
+
+_cache = weakref.WeakKeyDictionary()
+
+
+class Plan:
+    """Return-maximizing policy for one board, found by finite-horizon value iteration.
+
+    Uses the solver's state space (collected-token mask, jumps, cell) and
+    transition table, but scores moves with MazeWorldEnv's rewards instead
+    of counting steps, so detours that pick up a +5 token are taken when
+    they pay off. Because of the timeout penalty the best move depends on
+    how many steps are left, so `values[k]` holds the value of every state
+    with k steps to go (int16, 2 bytes per state per step); each of the
+    `max_steps` backups is one gather over the whole (num_states, 4) table.
+
+    Tokens beyond the solver's max_tokens are played as plain tiles.
+    """
+
+    def __init__(self, field, max_steps=200):
+        self.field = field
+        self.max_steps = max_steps
+        # Unreachable states holding more jumps than tokens taken can index
+        # past the table on a pickup; they are cut off from the future below
+        next_state = np.minimum(field.next_state, field.num_states - 1)
+        self.next_state = next_state
+        states = np.arange(field.num_states)
+        masks, _, _ = field.decode(states)
+        next_masks, _, next_cells = field.decode(next_state)
+
+        # Reward of every (state, action) and whether the episode ends there
+        won = next_cells == field.treasure_cell
+        picked = next_masks != masks[:, None]
+        self.rewards = (STEP_REWARD + WIN_REWARD * won + TOKEN_REWARD * picked).astype(np.int32)
+        # Episodes end on the treasure, so it contributes no future value
+        self._continues = ~won & (field.next_state < field.num_states)
+
+        # values[0] is never used: the step taken with one step left ends the
+        # episode with the timeout penalty, which later layers inherit
+        values = np.zeros((max_steps + 1, field.num_states), dtype=np.int16)
+        values[1] = self.rewards.max(axis=1) + TIMEOUT_REWARD
+        for k in range(2, max_steps + 1):
+            q = self.rewards + np.where(self._continues, values[k - 1][next_state], 0)
+            values[k] = q.max(axis=1)
+        self.values = values
+
+    def q_values(self, state, steps_left):
+        """Return of each action from `state` with `steps_left` steps remaining."""
+        if steps_left <= 1:
+            return self.rewards[state] + TIMEOUT_REWARD
+        future = self.values[steps_left - 1][self.next_state[state]]
+        return self.rewards[state] + np.where(self._continues[state], future, 0)
+
+    def action(self, state, steps_left):
+        return int(np.argmax(self.q_values(state, steps_left)))
+
+    @property
+    def start_value(self):
+        """Optimal return of a fresh episode."""
+        return int(self.values[self.max_steps][self.field.state_index((0, 0), 0)])
+
+
+def plan(board, max_steps=200):
+    """Plan for `board`, computed once per board and cached like solver.solve.
+
+    Compute it before the board is played (e.g. right after reset); the
+    plan covers every token mask, so it stays valid as tokens are taken.
+    """
+    result = _cache.get(board)
+    if result is None or result.max_steps != max_steps:
+        result = Plan(solve(board), max_steps)
+        _cache[board] = result
+    return result
+
+
+class PlannerAgent:
+    """Optimal agent for MazeWorldEnv with the predict() interface of an SB3 model.
+
+    The env's observation leaves out the tiles, so the agent reads the full
+    state (board, position, jumps, step count) from the one env it plays.
+    It therefore predicts only for that env's current observation: batched
+    observations, e.g. from PolicyServer or a vector env, raise ValueError.
+    """
+
+    def __init__(self, env):
+        self.env = env
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        env = self.env.unwrapped
+        agent = observation["agent"] if isinstance(observation, dict) else None
+        if np.ndim(agent if agent is not None else observation) > 1:
+            raise ValueError("PlannerAgent plans for the single env it was given, not a batch of observations")
+        if agent is not None and tuple(np.asarray(agent).tolist()) != tuple(env._agent_location.tolist()):
+            raise ValueError("The observation is not the current state of the planner's env")
+        board = env.board
+        result = plan(board, env.max_steps)
+        field = result.field
+        # Tokens already gone from the board are the collected ones
+        collected = 0
+        for k, (x, y) in enumerate(field.tokens.tolist()):
+            if board.grid[x][y] != TileColor.ORANGE:
+                collected |= 1 << k
+        pos = tuple(int(v) for v in env._agent_location)
+        index = field.state_index(pos, env.player.get_jumps(), collected)
+        return np.array(result.action(index, env.max_steps - env.step_count)), None
+
+
+def generate_demonstrations(num_episodes, path=None, seed=None, **env_kwargs):
+    """Play `num_episodes` planner episodes, recording them to the episode file `path` if given.
+
+    The file holds each starting board and the actions taken (see
+    episodes.EpisodeFile), ready for imitation pre-training. Returns the
+    (returns, won) arrays of the episodes.
+    """
+    from environment import MazeWorldEnv
+
+    env = MazeWorldEnv(**env_kwargs)
+    if path is not None:
+        from episodes import EpisodeRecorder
+        env = EpisodeRecorder(env, path)
+    agent = PlannerAgent(env)
+    returns = np.zeros(num_episodes, dtype=int)
+    won = np.zeros(num_episodes, dtype=bool)
+    for episode in range(num_episodes):
+        obs, _ = env.reset(seed=seed if episode == 0 else None)
+        done = False
+        while not done:
+            action, _ = agent.predict(obs)
+            obs, reward, terminated, truncated, _ = env.step(action)
+            returns[episode] += reward
+            done = terminated or truncated
+        # Only the winning step is worth more than a token
+        won[episode] = reward > TOKEN_REWARD
+    env.close()
+    return returns, won
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play MazeWorldEnv with the optimal planner")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("-n", type=int, default=8, help="Board size")
+    parser.add_argument("--seed", type=int, help="Base seed of the boards")
+    parser.add_argument("--record", help="Episode file to append the demonstrations to")
+
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    returns, won = generate_demonstrations(args.episodes, args.record, args.seed, min_size=args.n, max_size=args.n)
+    elapsed = time.perf_counter() - start
+    print(f"{args.episodes} episodes in {elapsed:.2f}s ({elapsed / args.episodes * 1e3:.1f}ms each), "
+          f"mean return {returns.mean():.1f}, {won.mean():.1%} won")
+
+
+if __name__ == "__main__":
+    main()
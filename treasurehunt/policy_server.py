@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import contextlib
+import time
+
+import numpy as np
+
+
+class PolicyServer:
+    """Serve one policy to many concurrent game sessions with batched forward passes.
+
+    Sessions are coroutines on the same event loop that call
+    `await server.act(obs)`. Requests are collected until `max_batch_size`
+    are waiting, the oldest has waited `max_latency` seconds, or every
+    session registered with `session()` is waiting. They then go through a
+    single `policy.predict` call, and each caller gets its own action back.
+
+    `policy` is anything with SB3's `predict(obs, deterministic=...)`, e.g. a
+    loaded PPO model. Latency (submission to result) and batch sizes are
+    kept for `summary()`, to help pick a window that trades throughput
+    against responsiveness.
+    """
+
+    def __init__(self, policy, max_batch_size=256, max_latency=0.002, deterministic=True):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.deterministic = deterministic
+        # Sessions that may submit a request; when all of them are waiting
+        # there is nothing to gain from holding the batch open
+        self.active_sessions = 0
+        self._pending = []
+        self._wakeup = None
+        self._task = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.latencies = []
+        self.batch_sizes = []
+        self.inference_time = 0.0
+        self.started = time.perf_counter()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+    async def stop(self):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    @contextlib.contextmanager
+    def session(self):
+        """Register a session for as long as the block runs."""
+        self.active_sessions += 1
+        try:
+            yield self
+        finally:
+            self.active_sessions -= 1
+            # The remaining sessions may now all be waiting
+            if self._pending:
+                self._wakeup.set()
+
+    async def act(self, obs):
+        """Action the policy takes for one observation."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((obs, future, loop.time()))
+        self._wakeup.set()
+        return await future
+
+    def _batch_ready(self):
+        return (len(self._pending) >= self.max_batch_size
+                or 0 < self.active_sessions <= len(self._pending))
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+            deadline = self._pending[0][2] + self.max_latency
+            while not self._batch_ready():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if self._pending:
+                self._wakeup.set()
+            self._run_batch(batch, loop)
+
+    def _run_batch(self, batch, loop):
+        observations = [obs for obs, _, _ in batch]
+        if isinstance(observations[0], dict):
+            stacked = {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+        else:
+            stacked = np.stack(observations)
+
+        start = time.perf_counter()
+        try:
+            actions, _ = self.policy.predict(stacked, deterministic=self.deterministic)
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.inference_time += time.perf_counter() - start
+
+        now = loop.time()
+        for (_, future, submitted), action in zip(batch, actions):
+            if not future.done():
+                future.set_result(action)
+            self.latencies.append(now - submitted)
+        self.batch_sizes.append(len(batch))
+
+    def summary(self):
+        if not self.batch_sizes:
+            return "Policy server: no requests"
+        latencies = np.array(self.latencies) * 1e3
+        sizes = np.array(self.batch_sizes)
+        elapsed = time.perf_counter() - self.started
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        size_p50, size_p99 = np.percentile(sizes, [50, 99])
+        return (
+            f"Policy server: {len(latencies)} requests in {len(sizes)} batches, "
+            f"{len(latencies) / elapsed:.0f} requests/s, {100 * self.inference_time / elapsed:.1f}% in inference\n"
+            f"  latency ms  p50={p50:.2f} p90={p90:.2f} p99={p99:.2f} max={latencies.max():.2f}\n"
+            f"  batch size  mean={sizes.mean():.1f} p50={size_p50:.0f} p99={size_p99:.0f} max={sizes.max()}"
+        )
+
+
+async def play_episode(server, env, seed=None, options=None):
+    """Play one episode of `env` with actions from `server`; returns (total reward, steps)."""
+    obs, _ = env.reset(seed=seed, options=options)
+    total = 0
+    steps = 0
+    done = False
+    while not done:
+        action = await server.act(obs)
+        obs, reward, terminated, truncated, _ = env.step(action)
+        total += reward
+        steps += 1
+        done = terminated or truncated
+    return total, steps
+
+
+async def evaluate(policy, num_episodes, concurrency=256, max_latency=0.002, seed=None, **env_kwargs):
+    """Play `num_episodes` episodes over `concurrency` envs sharing one PolicyServer.
+
+    Episode i is played on board i of `seed` (see MazeWorldEnv.reset), so
+    results do not depend on `concurrency`. Returns (returns, lengths,
+    server) with the server's statistics.
+    """
+    from environment import MazeWorldEnv
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+    returns = np.zeros(num_episodes, dtype=int)
+    lengths = np.zeros(num_episodes, dtype=int)
+    next_episode = iter(range(num_episodes))
+
+    async with PolicyServer(policy, max_batch_size=concurrency, max_latency=max_latency) as server:
+
+        async def run_session():
+            env = MazeWorldEnv(**env_kwargs)
+            with server.session():
+                for episode in next_episode:
+                    returns[episode], lengths[episode] = await play_episode(
+                        server, env, seed, {"episode_index": episode})
+
+        await asyncio.gather(*(run_session() for _ in range(min(concurrency, num_episodes))))
+    return returns, lengths, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a saved model on many boards with batched inference")
+    parser.add_argument("model", help="Path of a saved PPO model")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=256, help="Games played at once")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Longest a request waits for its batch to fill")
+    parser.add_argument("-n", type=int, default=8, help="Board size")
+    parser.add_argument("--seed", type=int)
+
+    args = parser.parse_args(argv)
+    from stable_baselines3 import PPO
+
+    model = PPO.load(args.model)
+    start = time.perf_counter()
+    returns, lengths, server = asyncio.run(evaluate(
+        model, args.episodes, args.concurrency, args.window_ms / 1e3, args.seed, min_size=args.n, max_size=args.n,
+    ))
+    elapsed = time.perf_counter() - start
+    print(f"{args.episodes} episodes ({lengths.sum()} steps) in {elapsed:.2f}s, "
+          f"mean return {returns.mean():.1f}, mean length {lengths.mean():.1f}")
+    print(server.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+
+from board import TileColor
+
+# Same colours as the Tk GUI, indexed by TileColor value
+TILE_RGB = np.zeros((len(TileColor), 3), dtype=np.uint8)
+TILE_RGB[TileColor.BLUE.value] = (0x4A, 0x90, 0xE2)
+TILE_RGB[TileColor.YELLOW.value] = (0xF5, 0xD5, 0x47)
+TILE_RGB[TileColor.ORANGE.value] = (0xFF, 0x8C, 0x42)
+TILE_RGB[TileColor.RED.value] = (0xE7, 0x4C, 0x3C)
+TILE_RGB[TileColor.GREEN.value] = (0x2E, 0xCC, 0x71)
+TILE_RGB[TileColor.PLAYER.value] = (0x8E, 0x44, 0xAD)
+GRID_RGB = np.array((0x2C, 0x3E, 0x50), dtype=np.uint8)
+WALL_RGB = np.array((0xC0, 0x39, 0x2B), dtype=np.uint8)
+
+
+class RgbRenderer:
+    """Draws boards as (n * cell_size, n * cell_size, 3) uint8 images without a display.
+
+    Board row x is image row band x, like the Tk GUI: a horizontal wall is
+    drawn along the bottom of its cell and a vertical wall along the left.
+    `set_board` paints the tiles, grid lines and walls once into a cached
+    background; `render` then only repaints the cells whose tile changed
+    since the last frame and moves the agent marker. `render_episode` draws
+    every frame of a recorded episode at once.
+    """
+
+    def __init__(self, cell_size=16, wall_width=None):
+        self.cell_size = cell_size
+        wall_width = wall_width or max(2, cell_size // 6)
+        pixels = np.arange(cell_size)
+        # Grid lines along the top and left of every cell
+        grid = (pixels[:, None] == 0) | (pixels[None, :] == 0)
+        self._grid_pattern = grid
+        self._h_pattern = np.broadcast_to(pixels[:, None] >= cell_size - wall_width, grid.shape)
+        self._v_pattern = np.broadcast_to(pixels[None, :] < wall_width, grid.shape)
+        centre = (cell_size - 1) / 2
+        radius = cell_size / 3
+        self._agent_mask = (pixels[:, None] - centre) ** 2 + (pixels[None, :] - centre) ** 2 <= radius ** 2
+        self.background = None
+
+    def set_board(self, tiles, walls_h, walls_v):
+        """Cache the background of a new board; tiles is the (n, n) TileColor value array."""
+        n = tiles.shape[0]
+        self.n = n
+        # Per-cell (n, c, n, c) view of which pixels are grid lines or walls,
+        # and what colour they have; everything else shows the tile colour
+        h = walls_h[:, None, :, None] & self._h_pattern[None, :, None, :]
+        v = walls_v[:, None, :, None] & self._v_pattern[None, :, None, :]
+        walls = h | v
+        self._overlay_mask = walls | self._grid_pattern[None, :, None, :]
+        self._overlay = np.where(walls[..., None], WALL_RGB, GRID_RGB)
+        self.tiles = tiles.copy()
+        self.background = self._paint(tiles)
+        self.frame = self.background.copy()
+        self._agent_pos = None
+
+    def _paint(self, tiles):
+        """Frames (..., n * c, n * c, 3) for tile arrays of shape (..., n, n)."""
+        n = self.n
+        c = self.cell_size
+        colours = TILE_RGB[tiles][..., :, None, :, None, :]
+        cells = np.where(self._overlay_mask[..., None], self._overlay, colours)
+        return np.ascontiguousarray(cells).reshape(tiles.shape[:-2] + (n * c, n * c, 3))
+
+    def _cells(self, image):
+        """(..., n, c, n, c, 3) view of an image, one block per board cell."""
+        n = self.n
+        c = self.cell_size
+        return image.reshape(image.shape[:-3] + (n, c, n, c, 3))
+
+    def render(self, tiles, agent_pos):
+        """Frame for the board in state `tiles` with the agent at `agent_pos`."""
+        background = self._cells(self.background)
+        frame = self._cells(self.frame)
+
+        xs, ys = np.nonzero(tiles != self.tiles)
+        if len(xs):
+            # Tiles only change when a token clears its 3x3 square
+            colours = TILE_RGB[tiles[xs, ys]][:, None, None, :]
+            background[xs, :, ys, :] = np.where(self._overlay_mask[xs, :, ys, :, None],
+                                                self._overlay[xs, :, ys, :], colours)
+            frame[xs, :, ys, :] = background[xs, :, ys, :]
+            self.tiles[xs, ys] = tiles[xs, ys]
+
+        if self._agent_pos is not None:
+            x, y = self._agent_pos
+            frame[x, :, y, :] = background[x, :, y, :]
+        x, y = int(agent_pos[0]), int(agent_pos[1])
+        frame[x, :, y, :][self._agent_mask] = TILE_RGB[TileColor.PLAYER.value]
+        self._agent_pos = (x, y)
+        return self.frame.copy()
+
+    def render_episode(self, tiles, walls_h, walls_v, positions, start=(0, 0)):
+        """(T + 1, H, W, 3) frames of an episode: the start and the state after each step.
+
+        Follows MazeWorldEnv.step: landing on an orange tile clears its 3x3
+        square. Frames between two pickups share the same background, so
+        they are filled with one broadcast copy and the agent markers of all
+        frames are then drawn with a single fancy-indexed assignment.
+        """
+        self.set_board(tiles, walls_h, walls_v)
+        n = self.n
+        positions = np.concatenate([np.asarray(start, dtype=np.intp)[None],
+                                    np.asarray(positions, dtype=np.intp).reshape(-1, 2)])
+        steps = len(positions)
+        frames = np.empty((steps,) + self.background.shape, dtype=np.uint8)
+
+        tiles = self.tiles
+        orange = TileColor.ORANGE.value
+        segment_start = 0
+        for t, (x, y) in enumerate(positions.tolist()):
+            if t and tiles[x, y] == orange:
+                frames[segment_start:t] = self.background
+                segment_start = t
+                rows = [(x - 1) % n, x, (x + 1) % n]
+                cols = [(y - 1) % n, y, (y + 1) % n]
+                cleared = tiles.copy()
+                cleared[np.ix_(rows, cols)] = TileColor.BLUE.value
+                self.render(cleared, (x, y))
+        frames[segment_start:] = self.background
+
+        cells = self._cells(frames)
+        t = np.arange(steps)
+        markers = cells[t, positions[:, 0], :, positions[:, 1], :]
+        markers[:, self._agent_mask] = TILE_RGB[TileColor.PLAYER.value]
+        cells[t, positions[:, 0], :, positions[:, 1], :] = markers
+        return frames
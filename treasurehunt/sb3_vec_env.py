@@ -0,0 +1,59 @@
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+
+class SB3VectorMazeWorldEnv(VecEnv):
+    """Expose a gymnasium VectorEnv (e.g. VectorMazeWorldEnv) as an SB3 VecEnv.
+
+    The wrapped env already auto-resets in the same step, so this only
+    translates the dict-of-arrays infos into SB3's list of per-env dicts and
+    moves `final_obs` to `terminal_observation`.
+    """
+
+    def __init__(self, vec_env):
+        self.vec_env = vec_env
+        self._actions = None
+        super().__init__(vec_env.num_envs, vec_env.single_observation_space, vec_env.single_action_space)
+
+    def reset(self):
+        obs, _ = self.vec_env.reset(seed=self._seeds[0])
+        self._reset_seeds()
+        return obs
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        obs, rewards, terminated, truncated, infos = self.vec_env.step(self._actions)
+        dones = terminated | truncated
+
+        env_infos = [{} for _ in range(self.num_envs)]
+        for key, value in infos.items():
+            if key.startswith("_") or key in ("final_obs", "final_info"):
+                continue
+            mask = infos.get("_" + key)
+            for i in range(self.num_envs):
+                if mask is None or mask[i]:
+                    env_infos[i][key] = value[i]
+
+        for i in np.flatnonzero(dones):
+            env_infos[i]["terminal_observation"] = infos["final_obs"][i]
+            env_infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+
+        return obs, rewards.astype(np.float32), dones, env_infos
+
+    def close(self):
+        self.vec_env.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.vec_env, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.vec_env, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self.vec_env, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,72 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    def __del__(self):
+        # Collected before arrays of it (e.g. at interpreter exit): the arrays
+        # hold the mapping, which is released along with the last of them
+        try:
+            self.close()
+        except (OSError, BufferError):
+            pass
+
+
+class SharedArrays:
+    """Named NumPy arrays laid out in one multiprocessing.shared_memory block.
+
+    The parent creates the block from a `{name: (shape, dtype)}` spec and
+    workers attach to it by `shm_name`, getting views onto the same memory.
+
+    Every array, and every view taken from one, holds the block's buffer, so
+    the memory cannot be unmapped under them: `close` raises BufferError
+    while any are alive, and can be called again once they are dropped.
+    """
+
+    def __init__(self, spec, shm_name=None):
+        self.spec = spec
+        offsets = {}
+        size = 0
+        for name, (shape, dtype) in spec.items():
+            dtype = np.dtype(dtype)
+            size = -(-size // dtype.alignment) * dtype.alignment
+            offsets[name] = size
+            size += int(np.prod(shape)) * dtype.itemsize
+
+        if shm_name is None:
+            self.shm = _SharedMemory(create=True, size=max(size, 1))
+            self.owner = True
+        else:
+            # Workers share the parent's resource tracker, so attaching does not
+            # hand ownership over; only the creating process unlinks the block
+            self.shm = _SharedMemory(name=shm_name)
+            self.owner = False
+        self._unlinked = False
+
+        # np.frombuffer keeps an export of shm.buf for as long as the array or
+        # any view of it lives, which np.ndarray(buffer=...) does not
+        self.arrays = {
+            name: np.frombuffer(self.shm.buf, dtype=dtype, count=int(np.prod(shape)), offset=offsets[name]).reshape(shape)
+            for name, (shape, dtype) in spec.items()
+        }
+
+    @property
+    def shm_name(self):
+        return self.shm.name
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def close(self):
+        """Unmap the block; the creator also unlinks it, even if arrays are still in use."""
+        self.arrays = {}
+        if self.owner and not self._unlinked:
+            # Only removes the name: existing mappings stay valid
+            self.shm.unlink()
+            self._unlinked = True
+        try:
+            self.shm.close()
+        except BufferError:
+            raise BufferError(f"Arrays of shared memory block {self.shm.name} are still in use; "
+                              "drop them before closing it") from None
@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+from board import TileColor
+
+# Everything MazeWorldEnv.step reads or changes. The board (walls included)
+# and its dynamics.BoardModel are shared by reference; its tiles are
+# described by `cleared`, the token squares cleared so far, which `tiles`
+# can replay onto the shared board, and by the model's `collected` mask
+EnvState = namedtuple("EnvState", [
+    "board", "model", "tiles", "cleared", "collected", "agent", "jumps", "step_count",
+    "episode_index", "board_seed", "optimal_path_length", "beasts",
+])
+
+
+def _square(x, y, n):
+    return [((x + dx) % n, (y + dy) % n) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class TileHistory:
+    """Undo log of clear_square on one board, shared by every snapshot of it.
+
+    Only the original tiles of cleared squares are copied, the first time
+    each cell is cleared. The board's tiles are then a function of the set
+    of cleared squares, so `restore` moves them to any snapshot's set by
+    undoing and redoing a few 3x3 squares.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.originals = {}
+        # Squares cleared on the board as it is now
+        self.cleared = frozenset()
+
+    def clear_square(self, x, y):
+        grid = self.board.grid
+        for cx, cy in _square(x, y, self.board.n):
+            if (cx, cy) not in self.originals:
+                self.originals[cx, cy] = grid[cx][cy]
+        self.board.clear_square(x, y)
+        self.cleared = self.cleared | {(x, y)}
+
+    def restore(self, cleared):
+        """Set the board's tiles to those after clearing exactly the squares in `cleared`."""
+        if cleared == self.cleared:
+            return
+        grid = self.board.grid
+        n = self.board.n
+        for x, y in self.cleared - cleared:
+            for cx, cy in _square(x, y, n):
+                grid[cx][cy] = self.originals[cx, cy]
+        # Undone squares may overlap ones that stay cleared, so clear those again.
+        # Tiles are written directly rather than through board.clear_square,
+        # which instrumentation counts as a token pickup
+        for x, y in cleared:
+            for cx, cy in _square(x, y, n):
+                grid[cx][cy] = TileColor.BLUE
+        self.cleared = cleared
@@ -0,0 +1,161 @@
+import weakref
+
+import numpy as np
+
+from board import TileColor
+from compact_board import blocked_moves, tile_array, wall_planes
+from dynamics import DIRECTIONS
+
+# Tokens beyond this many are left out of the state, see DistanceField
+MAX_TOKENS = 8
+
+UNREACHABLE = -1
+
+_cache = weakref.WeakKeyDictionary()
+
+
+class DistanceField:
+    """Exact shortest-path distances to the treasure over the full game state.
+
+    A state is (collected-token mask, jumps remaining, cell). Moves follow
+    MazeWorldEnv.step: wraparound, walls from Board.has_wall that can be
+    crossed by spending a jump, and orange tokens that give a jump and clear
+    their 3x3 square (and any other token inside it) when stepped on.
+
+    `dist[mask, jumps, x, y]` is the number of steps needed to reach the
+    treasure from that state, or UNREACHABLE. Only the first `max_tokens`
+    tokens are tracked; any others are treated as plain tiles. That can only
+    make distances longer, so a board reported solvable always is.
+    """
+
+    def __init__(self, tiles, walls_h, walls_v, max_tokens=MAX_TOKENS):
+        n = tiles.shape[0]
+        self.n = n
+        cells = n * n
+
+        token_cells = np.flatnonzero(tiles.ravel() == TileColor.ORANGE.value)[:max_tokens]
+        self.tokens = np.stack([token_cells // n, token_cells % n], axis=1)
+        num_tokens = len(token_cells)
+        self.num_jumps = num_tokens + 1
+        self.num_masks = 1 << num_tokens
+
+        self.token_id = np.full(cells, -1, dtype=np.int64)
+        self.token_id[token_cells] = np.arange(num_tokens)
+        # Tokens removed by Board.clear_square when token k is picked up
+        self.clears = np.zeros(num_tokens, dtype=np.int64)
+        for k, cell in enumerate(token_cells):
+            x, y = divmod(int(cell), n)
+            for dx in [-1, 0, 1]:
+                for dy in [-1, 0, 1]:
+                    other = self.token_id[((x + dx) % n) * n + (y + dy) % n]
+                    if other >= 0:
+                        self.clears[k] |= 1 << other
+
+        self.treasure_cell = int(np.flatnonzero(tiles.ravel() == TileColor.GREEN.value)[0])
+        self.next_state = self._transitions(blocked_moves(walls_h, walls_v))
+        dist = self._backward_bfs()
+        self.dist = dist.reshape(self.num_masks, self.num_jumps, n, n)
+
+    @property
+    def num_states(self):
+        return self.num_masks * self.num_jumps * self.n * self.n
+
+    def state_index(self, pos, jumps, collected=0):
+        jumps = min(jumps, self.num_jumps - 1)
+        return (collected * self.num_jumps + jumps) * self.n * self.n + pos[0] * self.n + pos[1]
+
+    def distance(self, pos, jumps=0, collected=0):
+        """Steps to the treasure from `pos` holding `jumps`, with tokens in `collected` taken."""
+        if pos[0] * self.n + pos[1] != self.treasure_cell:
+            return int(self.dist[collected, min(jumps, self.num_jumps - 1), pos[0], pos[1]])
+
+        # Standing on the treasure only wins once a step lands on it again
+        following = self.dist.ravel()[self.next_state[self.state_index(pos, jumps, collected)]]
+        following = following[following != UNREACHABLE]
+        return int(following.min()) + 1 if len(following) else UNREACHABLE
+
+    @property
+    def start_distance(self):
+        """Optimal episode length from the start state, or UNREACHABLE."""
+        return self.distance((0, 0))
+
+    @property
+    def solvable(self):
+        return self.start_distance != UNREACHABLE
+
+    def decode(self, states):
+        """Split state indices into (collected mask, jumps, cell)."""
+        cells = self.n * self.n
+        return states // (cells * self.num_jumps), (states // cells) % self.num_jumps, states % cells
+
+    def _transitions(self, blocked):
+        """(num_states, 4) index of the state each action leads to."""
+        n = self.n
+        states = np.arange(self.num_states, dtype=np.int64)
+        masks, jumps, cells = self.decode(states)
+        x, y = cells // n, cells % n
+
+        next_state = np.empty((self.num_states, 4), dtype=np.int64)
+        for action, (dx, dy) in enumerate(DIRECTIONS):
+            wall = blocked[x, y, action]
+            moved = ~wall | (jumps > 0)
+            new_jumps = jumps - (wall & moved)
+            new_cells = np.where(moved, ((x + dx) % n) * n + (y + dy) % n, cells)
+
+            # The tile under the agent is checked even when the move was blocked
+            token = self.token_id[new_cells]
+            picked = token >= 0
+            picked[picked] &= (masks[picked] >> token[picked]) & 1 == 0
+            new_masks = masks.copy()
+            new_masks[picked] |= self.clears[token[picked]]
+            new_jumps = new_jumps + picked
+
+            next_state[:, action] = (new_masks * self.num_jumps + new_jumps) * n * n + new_cells
+        return next_state
+
+    def _backward_bfs(self):
+        """Breadth-first search backwards from every treasure state.
+
+        Each layer gathers the predecessors of the whole frontier at once from
+        a CSR-style reverse edge list.
+        """
+        num_states = self.num_states
+        dist = np.full(num_states, UNREACHABLE, dtype=np.int32)
+        terminal = self.decode(np.arange(num_states))[2] == self.treasure_cell
+
+        # Episodes end on the treasure, so terminal states have no outgoing edges
+        sources = np.repeat(np.flatnonzero(~terminal), 4)
+        targets = self.next_state[~terminal].ravel()
+        order = np.argsort(targets, kind="stable")
+        predecessors = sources[order]
+        starts = np.searchsorted(targets[order], np.arange(num_states + 1))
+
+        frontier = np.flatnonzero(terminal)
+        dist[frontier] = 0
+        depth = 0
+        while len(frontier):
+            depth += 1
+            lengths = starts[frontier + 1] - starts[frontier]
+            total = lengths.sum()
+            if total == 0:
+                break
+            offsets = np.repeat(starts[frontier] - np.cumsum(lengths) + lengths, lengths)
+            candidates = predecessors[offsets + np.arange(total)]
+            candidates = np.unique(candidates[dist[candidates] == UNREACHABLE])
+            dist[candidates] = depth
+            frontier = candidates
+        return dist
+
+
+def solve(board, max_tokens=MAX_TOKENS):
+    """DistanceField of `board`, computed once per board and cached.
+
+    The field covers every token mask, so it stays valid after tokens are
+    picked up; compute it before the board is played (e.g. right after reset).
+    """
+    field = _cache.get(board)
+    if field is None:
+        walls_h, walls_v = wall_planes(board)
+        field = DistanceField(tile_array(board), walls_h, walls_v, max_tokens)
+        _cache[board] = field
+    return field
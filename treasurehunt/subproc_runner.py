@@ -0,0 +1,183 @@
+import multiprocessing as mp
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from environment import MazeWorldEnv
+from shared_arrays import SharedArrays
+
+
+class SharedMemoryVectorEnv(VectorEnv):
+    """VectorMazeWorldEnv boards split across worker processes.
+
+    Each of the `num_workers` processes owns a slice of the boards and runs
+    them as a VectorMazeWorldEnv. Actions, observations, rewards, done flags
+    and final observations are exchanged through one shared memory block, so
+    only short command strings go over the pipes. Wrap it in
+    SB3VectorMazeWorldEnv to train with SB3.
+
+    With `copy=False` the observations returned are views of that block:
+    the next step overwrites them, and close() raises BufferError while
+    any are still referenced, so drop them first (or keep copy=True).
+    Workers are stopped either way, and close() can be called again.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs=64, num_workers=None, min_size=8, max_size=15, max_steps=200,
+                 level_store=None, copy=True, start_method="forkserver", instrument=False, board_pool=None):
+        num_workers = num_workers or mp.cpu_count()
+        num_workers = max(1, min(num_workers, num_envs))
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.copy = copy
+
+        single_env = MazeWorldEnv(min_size=min_size, max_size=max_size, level_store=level_store,
+                                  board_pool=board_pool)
+        self.single_observation_space = single_env.observation_space
+        self.single_action_space = single_env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = gym.spaces.MultiDiscrete(np.full(num_envs, 4))
+
+        spec = {"actions": ((num_envs,), np.int64),
+                "rewards": ((num_envs,), np.int64),
+                "terminated": ((num_envs,), bool),
+                "truncated": ((num_envs,), bool),
+                "step_count": ((num_envs,), np.int64)}
+        for key, space in self.single_observation_space.spaces.items():
+            spec["obs_" + key] = ((num_envs,) + space.shape, space.dtype)
+            spec["final_" + key] = ((num_envs,) + space.shape, space.dtype)
+        self._shared = SharedArrays(spec)
+        self._obs_keys = list(self.single_observation_space.spaces)
+
+        # Contiguous slice of boards per worker
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._slices = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        env_kwargs = {"min_size": min_size, "max_size": max_size, "max_steps": max_steps,
+                      "level_store": getattr(single_env.level_store, "path", None),
+                      # Workers attach to the pool by name rather than each building boards
+                      "board_pool": getattr(single_env.board_pool, "name", None)}
+        self.instrument = instrument
+        ctx = mp.get_context(start_method)
+        self._pipes = []
+        self._processes = []
+        for worker, (lo, hi) in enumerate(self._slices):
+            parent_pipe, child_pipe = ctx.Pipe()
+            worker_kwargs = dict(env_kwargs, shard_index=worker, num_shards=num_workers)
+            process = ctx.Process(
+                target=_worker,
+                args=(self._shared.shm_name, spec, lo, hi, worker_kwargs, instrument, child_pipe),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy)
+        for pipe in self._pipes:
+            # Every worker deals its own shard of the same board stream
+            pipe.send(("reset", seed))
+        self._wait()
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        self._shared["actions"][:] = np.asarray(actions).reshape(self.num_envs)
+        for pipe in self._pipes:
+            pipe.send(("step", None))
+        self._wait()
+
+        terminated = self._shared["terminated"].copy()
+        truncated = self._shared["truncated"].copy()
+        step_count = self._shared["step_count"].copy()
+        infos = {"step_count": step_count, "_step_count": np.ones(self.num_envs, dtype=bool)}
+        for i in np.flatnonzero(terminated | truncated):
+            final_obs = {key: self._shared["final_" + key][i].copy() for key in self._obs_keys}
+            infos = self._add_info(infos, {"final_obs": final_obs, "final_info": {"step_count": int(step_count[i])}}, i)
+
+        return self._get_obs(), self._shared["rewards"].copy(), terminated, truncated, infos
+
+    def get_instrumentation(self):
+        """Instrumentation of every worker merged into one (requires instrument=True)."""
+        from instrumentation import Instrumentation
+
+        if not self.instrument:
+            raise RuntimeError("SharedMemoryVectorEnv was created with instrument=False")
+        for pipe in self._pipes:
+            pipe.send(("stats", None))
+        merged = Instrumentation()
+        for pipe in self._pipes:
+            merged.merge(pipe.recv())
+        return merged
+
+    def close_extras(self, **kwargs):
+        for pipe in self._pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._shared.close()
+
+    def _wait(self):
+        for pipe in self._pipes:
+            error = pipe.recv()
+            if error is not None:
+                raise RuntimeError(f"Worker failed: {error}")
+
+    def _get_obs(self):
+        obs = {key: self._shared["obs_" + key] for key in self._obs_keys}
+        if self.copy:
+            obs = {key: value.copy() for key, value in obs.items()}
+        return obs
+
+
+def _worker(shm_name, spec, lo, hi, env_kwargs, instrument, pipe):
+    # Imported here so spawned workers only load what stepping needs
+    from vector_env import VectorMazeWorldEnv
+
+    shared = SharedArrays(spec, shm_name)
+    instrumentation = None
+    if instrument:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+    env = VectorMazeWorldEnv(num_envs=hi - lo, copy=False, instrumentation=instrumentation, **env_kwargs)
+    obs_keys = list(env.single_observation_space.spaces)
+    try:
+        while True:
+            command, data = pipe.recv()
+            try:
+                if command == "reset":
+                    obs, _ = env.reset(seed=data)
+                elif command == "step":
+                    obs, rewards, terminated, truncated, infos = env.step(shared["actions"][lo:hi])
+                    shared["rewards"][lo:hi] = rewards
+                    shared["terminated"][lo:hi] = terminated
+                    shared["truncated"][lo:hi] = truncated
+                    shared["step_count"][lo:hi] = infos["step_count"]
+                    for i in np.flatnonzero(terminated | truncated):
+                        for key in obs_keys:
+                            shared["final_" + key][lo + i] = infos["final_obs"][i][key]
+                elif command == "stats":
+                    pipe.send(instrumentation.to_dict())
+                    continue
+                elif command == "close":
+                    break
+
+                for key in obs_keys:
+                    shared["obs_" + key][lo:hi] = obs[key]
+                pipe.send(None)
+            except Exception as error:
+                pipe.send(repr(error))
+    finally:
+        shared.close()
+        pipe.close()
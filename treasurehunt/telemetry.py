@@ -0,0 +1,196 @@
+import argparse
+import atexit
+import os
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"RLTELEMY"
+VERSION = 1
+
+# One finished episode; the binary log is MAGIC, VERSION and then these records
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("episode_index", "<i8"),
+    ("board_seed", "<u8"),
+    ("n", "<u2"),
+    ("jump_tokens", "<u2"),
+    ("density_walls", "<f4"),
+    ("return", "<i4"),
+    ("length", "<u4"),
+    ("won", "u1"),
+    ("jumps_used", "<u2"),
+    ("tokens_collected", "<u2"),
+])
+_CSV_FORMATS = ["%.3f", "%d", "%d", "%d", "%d", "%.4f", "%d", "%d", "%d", "%d", "%d"]
+
+
+class Telemetry:
+    """Episode log written by a background thread, fed from the env's step.
+
+    `record` copies one finished episode into a preallocated ring buffer of
+    `capacity` records and returns; it never waits for the writer. A writer
+    thread moves whatever accumulated to `path` every `flush_interval`
+    seconds, or sooner once a quarter of the buffer is filled. If the
+    buffer is full the episode is dropped and counted in `dropped`.
+
+    Files ending in .csv get a CSV with a header row, anything else the
+    binary log read_telemetry() loads; existing files are appended to.
+    Records reach the disk only after a flush, so call `close()` (also run
+    at exit) to write the last ones.
+
+    The env thread only writes slots and advances `_head`; the writer only
+    copies slots and advances `_tail`. Under the GIL each of those is a
+    single write, so the buffer itself needs no lock. The one lock `record`
+    can take is the wake-up Event's, once per quarter of the buffer; the
+    writer holds it only briefly around its waits, never during I/O.
+    """
+
+    def __init__(self, path, capacity=4096, flush_interval=1.0):
+        self.path = path
+        self.csv = path.endswith(".csv")
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._buffer = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self._wake_at = max(capacity // 4, 1)
+        # Records ever recorded, and ever handed to the writer
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+        self.written = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            if self.csv:
+                self._file.write((",".join(RECORD_DTYPE.names) + "\n").encode())
+            else:
+                self._file.write(MAGIC + VERSION.to_bytes(4, "little"))
+        elif not self.csv:
+            _check_header(path)
+
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, episode_index, board_seed, n, jump_tokens, density_walls, episode_return, length, won,
+               jumps_used, tokens_collected):
+        head = self._head
+        pending = head - self._tail
+        if pending >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer[head % self.capacity] = (time.time(), episode_index, board_seed, n, jump_tokens, density_walls,
+                                              episode_return, length, won, jumps_used, tokens_collected)
+        # Publish the slot only once it is written
+        self._head = head + 1
+        if pending + 1 == self._wake_at:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closing:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        tail, head = self._tail, self._head
+        if head == tail:
+            return
+        records = self._buffer.take(np.arange(tail, head) % self.capacity)
+        # The slots are free again as soon as they are copied
+        self._tail = head
+        if self.csv:
+            np.savetxt(self._file, records, fmt=_CSV_FORMATS, delimiter=",")
+        else:
+            self._file.write(records.tobytes())
+        self._file.flush()
+        self.written += len(records)
+
+    def close(self):
+        """Write every recorded episode and stop the writer thread."""
+        if self._closing:
+            return
+        self._closing = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        version = int.from_bytes(f.read(4), "little")
+    if version != VERSION:
+        raise ValueError(f"Unsupported telemetry log version {version}")
+
+
+def read_telemetry(path):
+    """Structured RECORD_DTYPE array of every episode in a CSV or binary telemetry log."""
+    if path.endswith(".csv"):
+        return np.loadtxt(path, dtype=RECORD_DTYPE, delimiter=",", skiprows=1, ndmin=1)
+    _check_header(path)
+    size = os.path.getsize(path) - len(MAGIC) - 4
+    # A record still being appended is left out
+    return np.fromfile(path, dtype=RECORD_DTYPE, count=size // RECORD_DTYPE.itemsize, offset=len(MAGIC) + 4)
+
+
+def training_curve(records, window=100):
+    """(episodes, mean return, success rate) over consecutive windows of `window` episodes."""
+    count = len(records) // window * window
+    if count == 0:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
+    returns = records["return"][:count].reshape(-1, window).mean(axis=1)
+    success = records["won"][:count].reshape(-1, window).mean(axis=1)
+    return np.arange(window, count + 1, window), returns, success
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize or plot an episode telemetry log")
+    parser.add_argument("path", help="CSV or binary log written by Telemetry")
+    parser.add_argument("-w", "--window", type=int, default=100, help="Episodes per point of the curve")
+    parser.add_argument("--plot", help="Save the training curve to this image (needs matplotlib)")
+
+    args = parser.parse_args(argv)
+    records = read_telemetry(args.path)
+    if len(records) == 0:
+        print("No episodes")
+        return
+    print(f"{len(records)} episodes, {int(records['length'].sum())} steps: "
+          f"mean return {records['return'].mean():.2f}, success {100 * records['won'].mean():.1f}%, "
+          f"mean length {records['length'].mean():.1f}, tokens/episode {records['tokens_collected'].mean():.2f}, "
+          f"jumps/episode {records['jumps_used'].mean():.2f}")
+    episodes, returns, success = training_curve(records, args.window)
+    for episode, mean_return, rate in zip(episodes, returns, success):
+        print(f"{episode:>10} return={mean_return:8.2f} success={100 * rate:5.1f}%")
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        fig, (return_axis, success_axis) = plt.subplots(2, 1, sharex=True, figsize=(8, 6))
+        return_axis.plot(episodes, returns)
+        return_axis.set_ylabel(f"Mean return ({args.window} episodes)")
+        success_axis.plot(episodes, 100 * success)
+        success_axis.set_ylabel("Success %")
+        success_axis.set_xlabel("Episodes")
+        fig.tight_layout()
+        fig.savefig(args.plot)
+        print(f"Saved {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import shutil
+import sys
+
+from board import TileColor
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+
+
+def _move_to(row, col):
+    return f"\x1b[{row};{col}H"
+
+
+class TerminalRenderer:
+    """Draws a board in the terminal, rewriting only the cells that changed.
+
+    The first frame (and any frame after the view scrolls) is built in one
+    buffer in the same layout as Board.print_grid and written with a single
+    call. Later frames move the cursor with ANSI escapes to the cells whose
+    letter changed and rewrite just those, plus the status line under the
+    board. Boards larger than the terminal are shown through a window that
+    scrolls, wrapping like the board, to follow the player.
+
+    When `out` is not a terminal every frame is written in full without
+    escapes, so the output can be piped or logged.
+    """
+
+    def __init__(self, board, out=None, view_rows=None, view_cols=None, reserved_lines=4):
+        self.out = out if out is not None else sys.stdout
+        self.ansi = hasattr(self.out, "isatty") and self.out.isatty()
+        if view_rows is None or view_cols is None:
+            # Each cell is 4 characters wide and 2 lines high, plus a border;
+            # keep `reserved_lines` free for the status line and prompts
+            columns, lines = shutil.get_terminal_size()
+            view_cols = view_cols or max(1, (columns - 1) // 4)
+            view_rows = view_rows or max(1, (lines - reserved_lines - 1) // 2)
+        self.view_rows = view_rows
+        self.view_cols = view_cols
+        self.set_board(board)
+
+    def set_board(self, board):
+        """Show a new board; the next render draws a full frame."""
+        self.board = board
+        self.rows = min(board.n, self.view_rows)
+        self.cols = min(board.n, self.view_cols)
+        self.origin = (0, 0)
+        # Letter currently on screen in every view slot, None before the first frame
+        self._letters = None
+
+    def render(self, player_pos, status=""):
+        if self._follow(player_pos) or self._letters is None or not self.ansi:
+            self._write_frame(player_pos, status)
+            return
+
+        letters = self._view_letters(player_pos)
+        parts = []
+        for i, (row, shown) in enumerate(zip(letters, self._letters)):
+            if row != shown:
+                for j, (letter, old) in enumerate(zip(row, shown)):
+                    if letter != old:
+                        parts.append(_move_to(2 * i + 2, 4 * j + 3) + letter)
+        self._letters = letters
+        parts.append(_move_to(2 * self.rows + 2, 1) + CLEAR_LINE + status + "\n" + CLEAR_BELOW)
+        self.out.write("".join(parts))
+        self.out.flush()
+
+    def _write_frame(self, player_pos, status):
+        letters = self._view_letters(player_pos)
+        self._letters = letters
+        n = self.board.n
+        walls = self.board.walls
+        origin_x, origin_y = self.origin
+        rows = [(origin_x + i) % n for i in range(self.rows)]
+        cols = [(origin_y + j) % n for j in range(self.cols)]
+
+        # Same layout as Board.print_grid, including its top border
+        lines = ["".join("❚———" if ('v', rows[0], y) in walls else "————" for y in cols) + "—"]
+        for x, row_letters in zip(rows, letters):
+            lines.append("".join(
+                ("❚ " if ('v', x, y) in walls else "| ") + letter + " " for y, letter in zip(cols, row_letters)
+            ) + "|")
+            lines.append("".join("—===" if ('h', x, y) in walls else "————" for y in cols) + "—")
+        lines.append(status)
+
+        prefix = CLEAR_SCREEN if self.ansi else ""
+        self.out.write(prefix + "\n".join(lines) + "\n")
+        self.out.flush()
+
+    def _view_letters(self, player_pos):
+        n = self.board.n
+        grid = self.board.grid
+        origin_x, origin_y = self.origin
+        letters = []
+        for i in range(self.rows):
+            row = grid[(origin_x + i) % n]
+            letters.append([row[(origin_y + j) % n].name[0] for j in range(self.cols)])
+        i = (player_pos[0] - origin_x) % n
+        j = (player_pos[1] - origin_y) % n
+        if i < self.rows and j < self.cols:
+            letters[i][j] = TileColor.PLAYER.name[0]
+        return letters
+
+    def _follow(self, player_pos):
+        """Recentre the view if the player got close to its edge; True if it moved."""
+        n = self.board.n
+        moved = False
+        origin = list(self.origin)
+        for axis, size in enumerate((self.rows, self.cols)):
+            if size == n:
+                continue
+            margin = size // 4
+            offset = (player_pos[axis] - origin[axis]) % n
+            if not margin <= offset < size - margin:
+                origin[axis] = (player_pos[axis] - size // 2) % n
+                moved = True
+        self.origin = tuple(origin)
+        return moved
@@ -0,0 +1,22 @@
+"""ChunkedBoard generation.
+
+Run with `python -m pytest treasurehunt`.
+"""
+import numpy as np
+
+from board import TileColor
+from chunked_board import ChunkedBoard
+
+
+def test_taking_every_token_leaves_the_treasure():
+    # Seed 125 used to put a token square over the treasure at (114, 44)
+    for seed in [125, *range(200)]:
+        board = ChunkedBoard(200, 3, 0.6, seed=seed, chunk_size=64)
+        c = board.chunk_size
+        for cx in range(board.chunks_per_side):
+            for cy in range(board.chunks_per_side):
+                tiles = board.chunk(cx, cy).tiles
+                for x, y in np.argwhere(tiles == TileColor.ORANGE.value).tolist():
+                    board.clear_square(cx * c + x, cy * c + y)
+        x, y = board.treasure_pos
+        assert board.grid[x][y] == TileColor.GREEN, seed
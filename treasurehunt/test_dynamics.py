@@ -0,0 +1,188 @@
+"""dynamics.simulate and the envs built on it, against the rules they implement.
+
+Run with `python -m pytest treasurehunt`.
+"""
+import copy
+
+import numpy as np
+import pytest
+
+from board import Board, TileColor
+from compact_board import tile_array
+from dynamics import MAX_TOKENS, BoardModel, State, simulate
+from environment import MazeWorldEnv
+from episodes import EpisodeFile, EpisodeRecorder
+from level_store import write_level_store
+from multi_agent_env import MultiAgentMazeEnv
+from solver import solve
+
+
+# (dx, dy) of each action, written out here so the reference below shares nothing with dynamics
+_MOVES = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+
+def _reference_step(board, pos, jumps, step_count, action, max_steps, occupied=None):
+    """MazeWorldEnv.step as first written, on Board.has_wall and Board.clear_square.
+
+    Takes the token on `board`; returns (position, jumps, reward, done).
+    """
+    n = board.n
+    dx, dy = _MOVES[action]
+    target = ((pos[0] + dx) % n, (pos[1] + dy) % n)
+    if occupied is not None and occupied[target]:
+        pass
+    elif not Board.has_wall(board, pos, target):
+        pos = target
+    elif jumps > 0:
+        pos = target
+        jumps -= 1
+    reward = -1
+    done = False
+    tile = board.grid[pos[0]][pos[1]]
+    if tile == TileColor.GREEN:
+        reward += 100
+        done = True
+    if tile == TileColor.ORANGE:
+        jumps += 1
+        Board.clear_square(board, *pos)
+        reward += 5
+    if step_count + 1 >= max_steps:
+        reward -= 10
+        done = True
+    return pos, jumps, reward, done
+
+
+def _play(env, episodes, seed=0):
+    """Random actions on `env` and on the reference stepper in lockstep; returns event counts.
+
+    Each step is also run through dynamics.simulate on a model of the board
+    as it was dealt.
+    """
+    rng = np.random.default_rng(seed)
+    n = env.current_size
+    counts = dict(tokens=0, jumps=0, wraps=0, wins=0)
+    for episode in range(episodes):
+        env.reset(seed=seed if episode == 0 else None)
+        board = copy.deepcopy(env.board)
+        model = BoardModel.from_board(board)
+        collected = model.initial_state().collected
+        pos, jumps = (0, 0), 0
+        done = False
+        while not done:
+            action = int(rng.integers(4))
+            state = State(pos[0] * n + pos[1], jumps, env.step_count, collected)
+            obs, reward, done, _, _ = env.step(action)
+            # Beasts move before the agent, so the agent met them where they are now
+            occupied = None if env.beasts is None else env.beasts.occupancy
+            expected = _reference_step(board, pos, jumps, state.step_count, action, env.max_steps, occupied)
+            next_pos, next_jumps, expected_reward, expected_done = expected
+            assert tuple(obs["agent"].tolist()) == next_pos
+            assert env.player.get_jumps() == next_jumps
+            assert (reward, done) == (expected_reward, expected_done)
+
+            flat = None if occupied is None else occupied.ravel()
+            next_state, simulated_reward, simulated_done = simulate(model, state, action, env.max_steps, flat)
+            assert divmod(int(next_state.cell), n) == next_pos and int(next_state.jumps) == next_jumps
+            assert (int(simulated_reward), bool(simulated_done)) == (reward, done)
+
+            counts["tokens"] += next_jumps > jumps
+            counts["jumps"] += next_jumps < jumps
+            counts["wraps"] += max(abs(next_pos[0] - pos[0]), abs(next_pos[1] - pos[1])) > 1
+            counts["wins"] += reward > 50
+            pos, jumps, collected = next_pos, next_jumps, next_state.collected
+        assert np.array_equal(tile_array(board), tile_array(env.board))
+    return counts
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(min_size=5, max_size=5),
+    dict(min_size=8, max_size=8, compact_board=True),
+    dict(min_size=12, max_size=12, compact_board=True, num_beasts=20),
+])
+def test_env_step_matches_reference_rules(kwargs):
+    counts = _play(MazeWorldEnv(**kwargs), 40)
+    assert all(counts.values()), counts
+
+
+def test_env_step_matches_reference_rules_on_wide_boards(tmp_path):
+    store = write_level_store(str(tmp_path / "levels.bin"), 3, 30, 140, 0.6, verbose=False)
+    env = MazeWorldEnv(min_size=30, max_size=30, level_store=store)
+    env.max_steps = 400
+    # 108 to 124 tokens, so simulate needs its Python int masks
+    assert all(len(BoardModel.from_board(store.to_board(level)).tokens) > MAX_TOKENS for level in range(3))
+    counts = _play(env, 3)
+    assert counts["tokens"] and counts["jumps"] and counts["wraps"], counts
+
+
+def test_batched_simulate_matches_single_states():
+    env = MazeWorldEnv(min_size=6, max_size=6, compact_board=True)
+    env.reset(seed=3)
+    model = BoardModel.from_board(env.board)
+    rng = np.random.default_rng(0)
+    count = 500
+    states = State(rng.integers(36, size=count), rng.integers(3, size=count), rng.integers(200, size=count),
+                   rng.integers(1 << len(model.tokens), size=count))
+    actions = rng.integers(4, size=count)
+    batch, rewards, terminated = simulate(model, states, actions)
+    for i in range(count):
+        single, reward, done = simulate(model, State(*(int(field[i]) for field in states)), int(actions[i]))
+        assert tuple(int(field[i]) for field in batch) == tuple(int(field) for field in single)
+        assert (rewards[i], terminated[i]) == (reward, done)
+
+
+def test_recorded_episodes_replay_with_their_step_limit(tmp_path):
+    path = str(tmp_path / "episodes.bin")
+    env = EpisodeRecorder(MazeWorldEnv(min_size=6, max_size=6), path)
+    env.unwrapped.max_steps = 30
+    rng = np.random.default_rng(0)
+    for episode in range(20):
+        env.reset(seed=episode)
+        done = False
+        while not done:
+            done = env.step(int(rng.integers(4)))[2]
+    env.close()
+    episodes = EpisodeFile(path)
+    assert len(episodes) == 20 and any(len(episode) == 30 for episode in episodes)
+    for episode in episodes:
+        assert episode.max_steps == 30
+        assert episode.verify() and episode.verify(use_env=True)
+
+
+def test_single_leopard_plays_like_the_env():
+    # Board i of both envs' streams is the same, and one agent never contends for a token
+    multi = MultiAgentMazeEnv(num_agents=1, size=7, max_steps=50)
+    env = MazeWorldEnv(min_size=7, max_size=7, compact_board=True)
+    env.max_steps = 50
+    rng = np.random.default_rng(0)
+    for episode in range(30):
+        multi.reset(seed=0 if episode == 0 else None)
+        env.reset(seed=0 if episode == 0 else None)
+        done = False
+        while not done:
+            action = int(rng.integers(4))
+            obs, rewards, terminated, _, _ = multi.step_arrays([action])
+            env_obs, reward, done, _, _ = env.step(action)
+            assert np.array_equal(obs["agent"][0], env_obs["agent"])
+            assert obs["jumps_remaining"][0, 0] == env.player.get_jumps()
+            assert (rewards[0], terminated[0]) == (reward, done)
+            assert np.array_equal(multi.board.tiles, env.board.tiles)
+
+
+def test_solver_transitions_match_env_step():
+    env = MazeWorldEnv(min_size=7, max_size=7, compact_board=True)
+    n = env.current_size
+    rng = np.random.default_rng(1)
+    for episode in range(30):
+        env.reset(seed=1 if episode == 0 else None)
+        field = solve(env.board)
+        done = False
+        while not done:
+            # The solver's mask holds the tokens gone from the board
+            gone = sum(1 << k for k, (x, y) in enumerate(field.tokens.tolist())
+                       if env.board.tiles[x, y] != TileColor.ORANGE.value)
+            index = field.state_index(tuple(env._agent_location.tolist()), env.player.get_jumps(), gone)
+            action = int(rng.integers(4))
+            obs, _, done, _, _ = env.step(action)
+            _, jumps, cell = field.decode(field.next_state[index, action])
+            assert divmod(int(cell), n) == tuple(obs["agent"].tolist())
+            assert jumps == env.player.get_jumps()
@@ -0,0 +1,184 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from compact_board import wall_tensor
+from dynamics import BoardModel, State, episode_return, simulate
+from environment import MazeWorldEnv
+from generator import board_seeds, episode_boards, episode_levels
+
+
+class VectorMazeWorldEnv(VectorEnv):
+    """Run `num_envs` MazeWorldEnv boards in lockstep as stacked NumPy arrays.
+
+    Every board shares the same size, so positions, jump counts and the
+    boards themselves (one batched dynamics.BoardModel) live in
+    `(num_envs, ...)` arrays and one `step(actions)` call advances all
+    boards with a single dynamics.simulate call. Finished boards are reset in
+    the same step; their last observation is returned in `infos["final_obs"]`.
+
+    With `copy=False` the returned observation arrays are the env's own
+    buffers and are only valid until the next `step`/`reset`, which saves
+    copying the `(num_envs, max_size, max_size, 4)` wall tensor every step.
+
+    Boards are numbered in the order they are dealt out and board i is drawn
+    from board_seed(base_seed, i), the same board a compact MazeWorldEnv
+    plays as episode i. With `num_shards` > 1 this env only deals the indices
+    congruent to `shard_index`, so several envs can split one board stream.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs=8, min_size=8, max_size=15, max_steps=200, copy=True, level_store=None,
+                 instrumentation=None, shard_index=0, num_shards=1, telemetry=None, board_pool=None):
+        self.num_envs = num_envs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.current_size = min_size
+        self.max_steps = max_steps
+        self.copy = copy
+
+        # Borrow the single-env spaces so both envs stay interchangeable; it also
+        # opens the optional level store or board pool and takes the board size from it
+        single_env = MazeWorldEnv(min_size=min_size, max_size=max_size, level_store=level_store,
+                                  board_pool=board_pool)
+        self.level_store = single_env.level_store
+        self.board_pool = single_env.board_pool
+        self.current_size = single_env.current_size
+        self.single_observation_space = single_env.observation_space
+        self.single_action_space = single_env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = gym.spaces.MultiDiscrete(np.full(num_envs, 4))
+
+        n = self.current_size
+        self._env_index = np.arange(num_envs)
+        # Boards are filled in by _reset_boards. Env i's cells are numbered
+        # from i * n * n in the model, and `_collected` are the token masks
+        empty = np.zeros((num_envs, n, n), dtype=np.uint8)
+        self._model = BoardModel(empty, empty.astype(bool), empty.astype(bool))
+        self._cells, self._jumps, self.step_count, self._collected = self._model.initial_state()
+        self._walls = np.zeros((num_envs, max_size, max_size, 4), dtype=int)
+        self._agent_location = np.zeros((num_envs, 2), dtype=int)
+        self._target_location = np.zeros((num_envs, 2), dtype=int)
+
+        self.base_seed = int(np.random.SeedSequence().entropy)
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self._boards_dealt = 0
+        # Index of the board each env is playing, and its seed and parameters
+        self.episode_index = np.zeros(num_envs, dtype=np.int64)
+        self._board_seeds = np.zeros(num_envs, dtype=np.uint64)
+        self._jump_tokens = np.zeros(num_envs, dtype=int)
+        self._density_walls = np.zeros(num_envs)
+        # (blocked, moved, picked) masks of the last step, read by instrumentation
+        self.last_step_events = None
+
+        self.instrumentation = None
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+        # Optional telemetry.Telemetry that every finished episode is recorded to
+        self.telemetry = telemetry
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is not None:
+            self.base_seed = seed
+            self._boards_dealt = 0
+
+        self._reset_boards(self._env_index)
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        n = self.current_size
+        idx = self._env_index
+
+        state = State(self._cells, self._jumps, self.step_count, self._collected)
+        next_state, rewards, terminated = simulate(self._model, state, actions, self.max_steps)
+        blocked = self._model.blocked[self._cells * 4 + actions]
+        moved = next_state.cell != self._cells
+        picked = next_state.collected != self._collected
+        self.last_step_events = (blocked, moved, picked)
+        self._cells, self._jumps, self.step_count, self._collected = next_state
+        self._agent_location[:, 0], self._agent_location[:, 1] = np.divmod(self._cells - idx * (n * n), n)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = {"step_count": self.step_count.copy(), "_step_count": np.ones(self.num_envs, dtype=bool)}
+
+        if terminated.any():
+            done_idx = idx[terminated]
+            if self.telemetry is not None:
+                self._record_episodes(done_idx)
+            for i in done_idx:
+                env_obs = self._get_env_obs(i)
+                infos = self._add_info(infos, {"final_obs": env_obs, "final_info": {"step_count": int(self.step_count[i])}}, i)
+            self._reset_boards(done_idx)
+
+        return self._get_obs(), rewards, terminated, truncated, infos
+
+    def _reset_boards(self, envs):
+        dealt = self._boards_dealt + np.arange(len(envs))
+        self._boards_dealt += len(envs)
+        indices = dealt * self.num_shards + self.shard_index
+        self.episode_index[envs] = indices
+        seeds = board_seeds(self.base_seed, indices)
+        self._board_seeds[envs] = seeds
+        if self.level_store is not None:
+            boards = self.level_store.batch(episode_levels(seeds, len(self.level_store)))
+            self._jump_tokens[envs] = self.level_store.jump_tokens
+            self._density_walls[envs] = self.level_store.density_walls
+        elif self.board_pool is not None:
+            levels = episode_levels(seeds, len(self.board_pool))
+            boards = self.board_pool.batch(levels)
+            self._jump_tokens[envs] = self.board_pool["jump_tokens"][levels]
+            self._density_walls[envs] = self.board_pool["density_walls"][levels]
+        else:
+            boards, self._jump_tokens[envs], self._density_walls[envs] = episode_boards(self.current_size, seeds)
+
+        self._model.set_boards(envs, boards.tiles, boards.walls_h, boards.walls_v)
+        if self._model.wide and self._collected.dtype != object:
+            # A board with more than dynamics.MAX_TOKENS tokens made the model's masks Python ints
+            self._collected = self._collected.astype(object)
+        self._walls[envs] = wall_tensor(boards.walls_h, boards.walls_v, self.max_size)
+        self._target_location[envs] = boards.treasure_pos
+        self._agent_location[envs] = 0
+        self._cells[envs] = envs * (self.current_size ** 2)
+        self._jumps[envs] = 0
+        self.step_count[envs] = 0
+        self._collected[envs] = 0
+
+    def _record_episodes(self, envs):
+        won = (self._agent_location[envs] == self._target_location[envs]).all(axis=1)
+        rows = zip(self.episode_index[envs].tolist(), self._board_seeds[envs].tolist(),
+                   self._jump_tokens[envs].tolist(), self._density_walls[envs].tolist(),
+                   self.step_count[envs].tolist(), won.tolist(), self._collected[envs].tolist(),
+                   self._jumps[envs].tolist())
+        for index, seed, jump_tokens, density_walls, length, episode_won, collected, jumps in rows:
+            # Tokens are the bits of the collected mask, and jumps start at zero
+            tokens = bin(collected).count("1")
+            self.telemetry.record(index, seed, self.current_size, jump_tokens, density_walls,
+                                  episode_return(length, tokens, episode_won, self.max_steps),
+                                  length, episode_won, tokens - jumps, tokens)
+
+    def _get_obs(self):
+        obs = {
+            "agent": self._agent_location,
+            "target": self._target_location,
+            "board_size": np.full((self.num_envs, 1), self.current_size),
+            "jumps_remaining": self._jumps[:, None],
+            "walls": self._walls,
+        }
+        if self.copy:
+            obs = {key: value.copy() for key, value in obs.items()}
+        return obs
+
+    def _get_env_obs(self, i):
+        """Observation of a single board, in MazeWorldEnv's format."""
+        return {
+            "agent": self._agent_location[i].copy(),
+            "target": self._target_location[i].copy(),
+            "board_size": np.array([self.current_size]),
+            "jumps_remaining": np.array([self._jumps[i]]),
+            "walls": self._walls[i].copy(),
+        }